@@ -0,0 +1,95 @@
+"""Benchmark — MinHash/LSH near-duplicate clustering vs exact all-pairs Jaccard.
+
+Generates a few thousand synthetic Chinese headlines, a share of which are
+reworded copies (labels, prefixes, small edits) of others, clusters them
+with dedup.cluster_titles and with a brute-force all-pairs comparison, and
+reports time and how many duplicate pairs the LSH path recovers.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_dedup
+    python -m benchmarks.bench_dedup --headlines 5000 --dup-rate 0.3
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import random
+import time
+
+from config import DEDUP_NGRAM, DEDUP_THRESHOLD
+from dedup import cluster_titles, jaccard, shingles
+
+_SUBJECTS = ["美联储", "欧洲央行", "日本央行", "中国央行", "现货黄金", "白银期货", "国际原油",
+             "美元指数", "人民币汇率", "A股三大指数", "恒生指数", "比特币", "十年期美债收益率"]
+_VERBS = ["宣布", "意外", "如期", "再度", "大幅", "小幅", "连续三日", "盘中"]
+_EVENTS = ["降息25个基点", "加息50个基点", "维持利率不变", "创历史新高", "跌破关键支撑",
+           "录得周线三连阳", "遭遇抛售", "获资金大举流入", "波动率骤升", "收复失地"]
+_TAILS = ["", "，市场情绪升温", "，分析师称或持续", "，避险需求上升", "，交易员加仓",
+          "，创年内最大涨幅", "，投资者静待数据"]
+_LABELS = ["【快讯】", "【独家】", "金十数据：", "财联社电，", "突发！", ""]
+
+
+def make_headlines(n: int, dup_rate: float, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    titles: list[str] = []
+    while len(titles) < n:
+        if titles and rng.random() < dup_rate:
+            base = rng.choice(titles)
+            variant = rng.choice(_LABELS) + base
+            if rng.random() < 0.5:
+                variant = variant.replace(rng.choice(_VERBS), rng.choice(_VERBS), 1)
+            titles.append(variant)
+        else:
+            titles.append(
+                f"{rng.choice(_SUBJECTS)}{rng.choice(_VERBS)}{rng.choice(_EVENTS)}"
+                f"{rng.choice(_TAILS)}（{rng.randrange(10**6)}）"
+            )
+    return titles
+
+
+def exact_pairs(titles: list[str], threshold: float) -> set[tuple[int, int]]:
+    sets = [shingles(t, DEDUP_NGRAM) for t in titles]
+    return {
+        (i, j)
+        for i, j in itertools.combinations(range(len(titles)), 2)
+        if jaccard(sets[i], sets[j]) >= threshold
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--headlines", type=int, default=3000)
+    parser.add_argument("--dup-rate", type=float, default=0.25)
+    parser.add_argument("--threshold", type=float, default=DEDUP_THRESHOLD)
+    args = parser.parse_args()
+
+    titles = make_headlines(args.headlines, args.dup_rate)
+    print(f"headlines={len(titles)} dup-rate={args.dup_rate} threshold={args.threshold}")
+
+    start = time.perf_counter()
+    clusters = cluster_titles(titles, threshold=args.threshold)
+    lsh_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pairs = exact_pairs(titles, args.threshold)
+    exact_time = time.perf_counter() - start
+
+    cluster_of = {}
+    for cid, members in enumerate(clusters):
+        for i in members:
+            cluster_of[i] = cid
+    found = sum(1 for i, j in pairs if cluster_of[i] == cluster_of[j])
+    merged = [c for c in clusters if len(c) > 1]
+
+    print(f"minhash/lsh : {lsh_time * 1000:9.1f} ms  "
+          f"{len(clusters)} clusters ({len(merged)} merged, {sum(map(len, merged))} headlines)")
+    print(f"all pairs   : {exact_time * 1000:9.1f} ms  {len(pairs)} duplicate pairs")
+    if pairs:
+        print(f"pair recall : {found / len(pairs):.1%}")
+    print(f"speedup: {exact_time / lsh_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
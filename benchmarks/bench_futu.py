@@ -0,0 +1,50 @@
+"""Benchmark — FutuScraper's TopHub parser on each installed HTML backend.
+
+Parses a synthetic TopHub hot list page (bench_pipeline's Futu fixture)
+with selectolax, lxml and BeautifulSoup's html.parser (the previous and
+fallback implementation), checks that every backend returns the same
+articles, and reports the best time per parse.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_futu
+    python -m benchmarks.bench_futu --rows 5000 --repeat 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import timeit
+from dataclasses import asdict
+
+from benchmarks.bench_pipeline import make_futu
+from scrapers.futu import FutuScraper, available_backends
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    html = make_futu(args.rows, random.Random(0)).decode()
+    scraper = FutuScraper()
+    backends = available_backends()
+    print(f"rows={args.rows} page={len(html.encode()) / 1024:.0f} KB backends={', '.join(backends)}")
+
+    expected = [asdict(a) for a in scraper._parse(html, "bs4")]
+    results = {}
+    for backend in backends:
+        same = [asdict(a) for a in scraper._parse(html, backend)] == expected
+        number = 3
+        best = min(timeit.repeat(lambda: scraper._parse(html, backend), number=number, repeat=args.repeat))
+        results[backend] = best / number * 1000
+        print(f"{backend:>10}: {results[backend]:9.2f} ms/parse  articles={len(expected)} "
+              f"identical={'yes' if same else 'NO'}")
+    for backend in backends[:-1]:
+        print(f"{backend} speedup over bs4: {results['bs4'] / results[backend]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
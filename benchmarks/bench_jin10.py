@@ -0,0 +1,96 @@
+"""Benchmark — streamed NUXT extraction vs full-page regex for Jin10.
+
+Serves a synthetic xnews.jin10.com page in 16 KB chunks through an
+httpx.MockTransport and compares the previous path (read the whole body,
+DOTALL regex over the page, evaluate and return the whole NUXT payload)
+with Jin10Scraper._try_http (stop reading at the script's </script>,
+return only the stores the article extraction reads). Reports body bytes
+read and the best time per fetch, and checks both give the same articles.
+Requires `node` on PATH.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_jin10
+    python -m benchmarks.bench_jin10 --articles 200 --state-kb 500 --trailing-kb 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import timeit
+from dataclasses import asdict
+
+import httpx
+
+from benchmarks.bench_nuxt_eval import make_nuxt_iife
+from config import JIN10_URL
+from scrapers.client import create_client
+from scrapers.jin10 import Jin10Scraper
+from scrapers.nuxt import get_evaluator
+
+_CHUNK = 16 * 1024
+
+
+def make_page(n_articles: int, state_kb: int, trailing_kb: int) -> bytes:
+    """A Jin10-like page: app markup, the NUXT script with an extra store of
+    about state_kb, then trailing_kb of markup after the script."""
+    store = json.dumps(["行情数据" * 8] * (state_kb * 1024 // 100), ensure_ascii=False)
+    iife = make_nuxt_iife(n_articles).replace("state:{user:{}", f"state:{{user:{{history:{store}}}", 1)
+    chrome = "".join(f'<div class="nav-item"><a href="/c/{i}">栏目{i}</a></div>' for i in range(200))
+    trailing = "<div class=\"footer-link\">金十数据 版权所有</div>" * (trailing_kb * 1024 // 50)
+    return (
+        f"<!doctype html><html><head><meta charset=\"utf-8\"><title>金十数据</title></head>"
+        f"<body><div id=\"__nuxt\">{chrome}</div><script>window.__NUXT__={iife};</script>"
+        f"{trailing}<script src=\"/_nuxt/app.js\" defer></script></body></html>"
+    ).encode()
+
+
+def previous_try_http(scraper: Jin10Scraper):
+    """The previous path: full body, regex over the page, whole payload."""
+    resp = scraper._request("GET", JIN10_URL)
+    match = re.search(r"window\.__NUXT__\s*=\s*(.+?);\s*</script>", resp.text, re.DOTALL)
+    return scraper._extract_articles(get_evaluator().evaluate(match.group(1)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=50)
+    parser.add_argument("--state-kb", type=int, default=200, help="size of a store not holding articles")
+    parser.add_argument("--trailing-kb", type=int, default=20, help="markup after the NUXT script")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    page = make_page(args.articles, args.state_kb, args.trailing_kb)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        chunks = (page[i:i + _CHUNK] for i in range(0, len(page), _CHUNK))
+        return httpx.Response(200, content=chunks, headers={"Content-Type": "text/html; charset=utf-8"})
+
+    client = create_client(transport=httpx.MockTransport(handler))
+    print(f"page={len(page) / 1024:.0f} KB articles={args.articles}")
+
+    results = {}
+    outputs = {}
+    for name, fetch in [("regex", previous_try_http), ("stream", Jin10Scraper._try_http)]:
+        scraper = Jin10Scraper(client=client)
+
+        def run():
+            scraper.stats = {"bytes": 0, "request_time": 0.0}
+            return fetch(scraper)
+
+        outputs[name] = [asdict(a) for a in run()]
+        read = scraper.stats["bytes"]
+        number = 3
+        best = min(timeit.repeat(run, number=number, repeat=args.repeat))
+        results[name] = best / number * 1000
+        print(f"{name:>7}: {results[name]:8.2f} ms/fetch  read={read / 1024:.0f} KB  "
+              f"articles={len(outputs[name])}")
+    client.close()
+    print(f"identical: {'yes' if outputs['regex'] == outputs['stream'] else 'NO'}  "
+          f"speedup: {results['regex'] / results['stream']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
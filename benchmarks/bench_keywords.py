@@ -0,0 +1,186 @@
+"""Benchmark — batched multi-category keyword scorer vs per-article regex.
+
+Scores synthetic headline + summary pairs with filters.KeywordScorer over
+every KEYWORD_CATEGORIES set, and compares it with the previous
+tag_precious_metals loop (one alternation regex, precious metals only,
+findall per article) and with that loop repeated once per category.
+
+First compares the precious-metals tags of both on a fixed set of real
+shaped headlines and lists every headline where they differ, with the
+rule of KeywordScorer that explains it (whole-word ASCII match or longest
+match); a difference neither rule explains is counted as unexplained.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_keywords
+    python -m benchmarks.bench_keywords --articles 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+
+from config import KEYWORD_CATEGORIES, PRECIOUS_METALS_KEYWORDS
+from filters import KeywordScorer, _is_whole_word, tag_precious_metals
+from scrapers.base import Article
+
+_FILLER = "市场分析人士认为短期内波动仍将持续投资者需关注风险政策面消息面资金面情绪面"
+
+# (title, summary) pairs shaped like the sources' headlines
+HEADLINES = [
+    ("现货黄金日内涨超1%，站上2400美元关口", "美联储降息预期升温，避险需求支撑金价"),
+    ("黄金期货主力合约收涨0.8%", "沪金、沪银同步走强"),
+    ("全球最大黄金ETF——SPDR持仓增加3.2吨", "GLD持仓升至850吨"),
+    ("央行连续第18个月增持黄金", "黄金储备升至7280万盎司，央行购金仍是金价主要支撑"),
+    ("高盛：上调金价目标至2700美元", "Goldman Sachs raises gold forecast on central bank buying"),
+    ("白银期货涨停，银价创十年新高", "光伏需求拉动白银消费"),
+    ("伦敦金午后跳水，伦敦银跟跌", "XAUUSD 失守2380，XAGUSD 跌超2%"),
+    ("COMEX黄金库存连续下降", "comex gold inventories fell for a third week"),
+    ("SLV与GLD资金流向出现分化", "iShares Silver Trust (SLV) saw outflows"),
+    ("Silvergate Capital宣布清算", "加密银行关闭，与白银无关"),
+    ("Goldman Sachs Q3 earnings beat estimates", "Investment banking revenue rose 20%"),
+    ("GLDM费率下调至0.10%", "小型黄金ETF吸引长期资金"),
+    ("Golden Week travel spending hits record", "国庆黄金周消费数据出炉"),
+    ("贵金属板块集体走强，铂金、钯金跟涨", "precious metals rally as dollar weakens"),
+    ("实物黄金销售火爆，金条金币供不应求", "多地银行暂停纸黄金开户"),
+    ("紫金矿业：拟收购海外金矿", "公司银矿项目进展顺利"),
+    ("美元指数走弱，人民币汇率升值", "外汇市场情绪回暖"),
+    ("A股三大指数集体收涨，成交额破万亿", "北向资金净流入超百亿"),
+    ("原油期货大跌5%，OPEC+增产超预期", "能源板块承压"),
+    ("silver demand from solar panels keeps rising", "Silver prices hit $32/oz"),
+    ("黄金储备与外储双双增加", "截至9月末，我国外汇储备规模为3.3万亿美元"),
+    ("避险资金涌入日元、瑞郎与黄金", "地缘局势紧张推升避险情绪"),
+    ("Gold-backed ETFs saw inflows in September", "gold.org data shows 18 tonnes added"),
+    ("比特币突破7万美元，数字黄金叙事再起", "BTC ETF资金持续流入"),
+]
+
+
+def _keywords(spec) -> list[str]:
+    return [kw if isinstance(kw, str) else kw[0] for kw in spec["keywords"]]
+
+
+def make_texts(n: int, seed: int = 0) -> tuple[list[str], list[str]]:
+    rng = random.Random(seed)
+    vocab = [kw for spec in KEYWORD_CATEGORIES.values() for kw in _keywords(spec)]
+    titles, summaries = [], []
+    for _ in range(n):
+        words = [rng.choice(vocab) for _ in range(rng.randint(0, 2))]
+        titles.append("".join(rng.choice(_FILLER) for _ in range(12)) + "".join(words))
+        summary = [rng.choice(_FILLER) for _ in range(rng.randint(40, 120))]
+        for kw in rng.sample(vocab, rng.randint(0, 3)):
+            summary.insert(rng.randrange(len(summary) + 1), kw)
+        summaries.append("".join(summary))
+    return titles, summaries
+
+
+def regex_loop(patterns: list[re.Pattern], titles: list[str], summaries: list[str]) -> int:
+    """The previous tag_precious_metals inner loop, once per pattern."""
+    hits = 0
+    for title, summary in zip(titles, summaries):
+        text = f"{title} {summary}"
+        for pattern in patterns:
+            matches = pattern.findall(text)
+            if matches:
+                hits += 1
+                seen = set()
+                for m in matches:
+                    lower = m.lower() if m.isascii() else m
+                    if lower not in seen:
+                        seen.add(lower)
+    return hits
+
+
+def _compile(keywords: list[str]) -> re.Pattern:
+    return re.compile("|".join(re.escape(kw) for kw in keywords), re.IGNORECASE)
+
+
+def previous_tags(pattern: re.Pattern, title: str, summary: str) -> list[str]:
+    """Tags the previous tag_precious_metals gave an article."""
+    tags, seen = [], set()
+    for m in pattern.findall(f"{title} {summary}"):
+        lower = m.lower() if m.isascii() else m
+        if lower not in seen:
+            seen.add(lower)
+            tags.append(m)
+    return tags
+
+
+def _explain(tag: str, text: str, other: list[str]) -> str:
+    """The KeywordScorer rule that accounts for tag being in only one of the
+    two tag lists, or "" if neither does. other is the opposite list."""
+    lower = tag.lower()
+    if any(lower != o.lower() and (lower in o.lower() or o.lower() in lower) for o in other):
+        return "longest match"
+    if tag.isascii() and not any(
+        _is_whole_word(text.lower(), m.start(), m.end()) for m in re.finditer(re.escape(lower), text.lower())
+    ):
+        return "whole word"
+    return ""
+
+
+def compare_tags(scorer: KeywordScorer) -> int:
+    """Print the headlines whose tags changed; return how many changes
+    neither rule explains."""
+    pattern = _compile(PRECIOUS_METALS_KEYWORDS)
+    articles = [Article(source="bench", title=t, url="", summary=s) for t, s in HEADLINES]
+    tag_precious_metals(articles, scorer)
+    changed = unexplained = 0
+    for article in articles:
+        old = previous_tags(pattern, article.title, article.summary)
+        new = article.tags
+        if sorted(t.lower() for t in old) == sorted(t.lower() for t in new):
+            continue
+        changed += 1
+        text = f"{article.title} {article.summary}"
+        notes = []
+        for tag, other, sign in [(t, new, "-") for t in old] + [(t, old, "+") for t in new]:
+            if tag.lower() in {o.lower() for o in other}:
+                continue
+            reason = _explain(tag, text, other)
+            unexplained += not reason
+            notes.append(f"{sign}{tag} ({reason or 'UNEXPLAINED'})")
+        print(f"  {article.title[:30]:<30}  {', '.join(notes)}")
+    print(f"tags vs previous: {len(articles) - changed}/{len(articles)} headlines identical, "
+          f"unexplained differences: {unexplained}")
+    return unexplained
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=20000)
+    args = parser.parse_args()
+
+    titles, summaries = make_texts(args.articles)
+    chars = sum(map(len, titles)) + sum(map(len, summaries))
+    print(f"articles={args.articles} text={chars / 1e6:.1f}M chars categories={len(KEYWORD_CATEGORIES)}")
+
+    metals = [_compile(PRECIOUS_METALS_KEYWORDS)]
+    per_category = [_compile(_keywords(spec)) for spec in KEYWORD_CATEGORIES.values()]
+    scorer = KeywordScorer()
+    compare_tags(scorer)
+
+    timings = {}
+    for name, fn in [
+        ("regex, metals only", lambda: regex_loop(metals, titles, summaries)),
+        ("regex per category", lambda: regex_loop(per_category, titles, summaries)),
+        ("scorer, all categories", lambda: scorer.score(titles, summaries)),
+    ]:
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+        print(f"{name:>24}: {best * 1000:8.1f} ms  ({args.articles / best / 1000:7.1f}k articles/s)")
+
+    results = scorer.score(titles, summaries)
+    scored = sum(1 for scores, _ in results if scores)
+    print(f"articles with any category: {scored}")
+    print(f"speedup vs regex per category: {timings['regex per category'] / timings['scorer, all categories']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
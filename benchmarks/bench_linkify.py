@@ -0,0 +1,88 @@
+"""Micro-benchmark — single-pass title linker vs the per-title regex loop.
+
+Links a few hundred synthetic headlines into a ~10 KB LLM-style response with
+both implementations and reports the time per call, with the automaton built
+per call and prebuilt once (as generate_topics_with_llm does).
+
+Run from the repo root:
+
+    python -m benchmarks.bench_linkify
+    python -m benchmarks.bench_linkify --titles 500 --size 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import timeit
+
+from main import _TitleLinker, _linkify_titles
+
+_CHARS = "黄金白银央行美联储降息加息通胀原油美元指数避险资金流入流出市场情绪期货价格大涨大跌"
+
+
+def _linkify_titles_regex(text: str, title_url_map: dict[str, str]) -> str:
+    """The previous implementation: one compiled regex and re.sub per title."""
+    for title in sorted(title_url_map, key=len, reverse=True):
+        url = title_url_map[title]
+        escaped = re.escape(title)
+        pattern = r"(?<!\[)" + escaped + r"(?!\]\()"
+        replacement = f"[{title}]({url})"
+        text = re.sub(pattern, replacement, text, count=0)
+    return text
+
+
+def _make_inputs(n_titles: int, size: int, seed: int = 0) -> tuple[str, dict[str, str]]:
+    rng = random.Random(seed)
+    titles = {}
+    while len(titles) < n_titles:
+        title = "".join(rng.choice(_CHARS) for _ in range(rng.randint(10, 24)))
+        titles[title] = f"https://example.com/news/{len(titles)}"
+    pool = list(titles)
+    parts = []
+    length = 0
+    i = 0
+    while length < size:
+        i += 1
+        part = (
+            f"### 选题{i}：{''.join(rng.choice(_CHARS) for _ in range(12))}\n\n"
+            f"- **核心角度**：{''.join(rng.choice(_CHARS) for _ in range(40))}\n"
+            f"- **素材来源**：{rng.choice(pool)}、{rng.choice(pool)}\n\n---\n\n"
+        )
+        parts.append(part)
+        length += len(part)
+    return "".join(parts), titles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--titles", type=int, default=300)
+    parser.add_argument("--size", type=int, default=10_000, help="response size in characters")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    text, title_url_map = _make_inputs(args.titles, args.size)
+    print(f"titles={len(title_url_map)} response={len(text)} chars")
+
+    new = _linkify_titles(text, title_url_map)
+    old = _linkify_titles_regex(text, title_url_map)
+    print(f"links inserted: automaton={new.count('](https://')} regex={old.count('](https://')}")
+
+    linker = _TitleLinker(title_url_map)
+    results = {}
+    for name, fn in [
+        ("regex loop", _linkify_titles_regex),
+        ("automaton", _linkify_titles),
+        ("prebuilt", lambda t, _: linker.linkify(t)),
+    ]:
+        number = 3
+        best = min(timeit.repeat(lambda: fn(text, title_url_map), number=number, repeat=args.repeat))
+        results[name] = best / number * 1000
+        print(f"{name:>10}: {results[name]:8.2f} ms/call")
+    print(f"speedup: {results['regex loop'] / results['automaton']:.1f}x including automaton build, "
+          f"{results['regex loop'] / results['prebuilt']:.1f}x with a prebuilt automaton")
+
+
+if __name__ == "__main__":
+    main()
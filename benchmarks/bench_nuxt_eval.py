@@ -0,0 +1,105 @@
+"""Benchmark — resident Node.js evaluator vs one `node` process per fetch.
+
+Evaluates a synthetic Jin10-style NUXT IIFE (parameter-substituted payload
+with an article list) through both paths and reports the time per
+evaluation. Requires `node` on PATH.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_nuxt_eval
+    python -m benchmarks.bench_nuxt_eval --articles 200 --runs 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import tempfile
+import time
+
+from scrapers.nuxt import NodeEvaluator
+
+
+def make_nuxt_iife(n_articles: int) -> str:
+    """Build a payload shaped like xnews.jin10.com's window.__NUXT__."""
+    params = [f"p{i}" for i in range(40)]
+    args = [json.dumps(f"值{i}", ensure_ascii=False) for i in range(40)]
+    items = []
+    for i in range(n_articles):
+        items.append(
+            "{id:%d,title:%s,introduction:%s,display_datetime:%s,detail_url:%s,"
+            "author:{nick:%s},hits:%d,tags:[%s,%s]}"
+            % (
+                i,
+                json.dumps(f"黄金价格再创新高 第{i}篇", ensure_ascii=False),
+                params[i % 40],
+                json.dumps("2026-01-01 08:00:00"),
+                json.dumps(f"/details/{100000 + i}"),
+                params[(i + 1) % 40],
+                i * 10,
+                params[(i + 2) % 40],
+                params[(i + 3) % 40],
+            )
+        )
+    body = (
+        "{layout:\"default\",data:[{},{list:[%s],total:%d}],fetch:{},"
+        "state:{user:{},config:{theme:p0}},serverRendered:true}"
+        % (",".join(items), n_articles)
+    )
+    return "(function(%s){return %s}(%s))" % (",".join(params), body, ",".join(args))
+
+
+def eval_per_process(raw_js: str):
+    """The previous path: write a temp file and start node for each payload."""
+    js_code = (
+        "try { console.log(JSON.stringify(" + raw_js + ")); }"
+        " catch(e) { process.exit(1); }"
+    )
+    with tempfile.NamedTemporaryFile(mode="w", suffix=".js", delete=False) as f:
+        f.write(js_code)
+        tmp_path = f.name
+    try:
+        result = subprocess.run(["node", tmp_path], capture_output=True, text=True, timeout=10)
+        return json.loads(result.stdout)
+    finally:
+        os.remove(tmp_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=60)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    raw_js = make_nuxt_iife(args.articles)
+    print(f"payload={len(raw_js) / 1024:.1f} KB articles={args.articles} runs={args.runs}")
+
+    evaluator = NodeEvaluator()
+    try:
+        start = time.perf_counter()
+        first = evaluator.evaluate(raw_js)
+        cold = time.perf_counter() - start
+        assert first == eval_per_process(raw_js)
+
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            eval_per_process(raw_js)
+        per_process = (time.perf_counter() - start) / args.runs
+
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            evaluator.evaluate(raw_js)
+        resident = (time.perf_counter() - start) / args.runs
+    finally:
+        evaluator.close()
+
+    print(f"node per fetch : {per_process * 1000:8.2f} ms/eval")
+    print(f"resident (cold): {cold * 1000:8.2f} ms (first call, includes node startup)")
+    print(f"resident (warm): {resident * 1000:8.2f} ms/eval")
+    print(f"speedup: {per_process / resident:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
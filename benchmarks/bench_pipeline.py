@@ -0,0 +1,286 @@
+"""Offline benchmark — every scraper and the report path on replayed payloads.
+
+Serves synthetic responses shaped like each source's real one (CLS depth
+API JSON, Jin10 page with a NUXT IIFE, TopHub HTML table, Eastmoney JSONP
+and Guba JSON) through an httpx.MockTransport, so the scrapers run their
+full request + parse path without touching the network. The scraped
+articles then go through tag_precious_metals, _linkify_titles on an
+LLM-style response and generate_report (into a temporary output dir and
+database).
+
+Each stage runs at 1x, 10x and 100x the usual payload size and reports
+the best wall time, throughput and peak Python memory (tracemalloc, in a
+separate untimed pass). The Jin10 stage needs `node` on PATH; memory of
+the node worker itself is not counted.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --scales 1 10 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+from html import escape
+
+import httpx
+
+import formatter
+from benchmarks.bench_nuxt_eval import make_nuxt_iife
+from config import (
+    CLS_API_URL,
+    EASTMONEY_GUBA_API_URL,
+    EASTMONEY_NEWS_API_URL,
+    FUTU_URL,
+    JIN10_URL,
+    PRECIOUS_METALS_KEYWORDS,
+)
+from filters import KeywordScorer, tag_precious_metals
+from main import _linkify_titles
+from scrapers.client import create_client
+from scrapers.cls import CLSScraper
+from scrapers.eastmoney_guba import EastmoneyGubaScraper
+from scrapers.eastmoney_news import EastmoneyNewsScraper
+from scrapers.futu import FutuScraper
+from scrapers.jin10 import Jin10Scraper
+from scrapers.validators import ValidatorStore
+from storage import ArticleStore
+
+# Articles per source at 1x, about what each source returns today
+BASE_COUNTS = {"cls": 20, "jin10": 20, "futu": 50, "eastmoney_news": 20, "eastmoney_guba": 20}
+
+_CHARS = "黄金白银央行美联储降息加息通胀原油美元指数避险资金流入流出市场情绪期货价格大涨大跌"
+
+
+def _text(rng: random.Random, n: int) -> str:
+    return "".join(rng.choice(_CHARS) for _ in range(n))
+
+
+def _title(rng: random.Random, i: int) -> str:
+    keyword = rng.choice(PRECIOUS_METALS_KEYWORDS) if rng.random() < 0.3 else ""
+    return f"{_text(rng, rng.randint(8, 20))}{keyword}（{i}）"
+
+
+def make_cls(n: int, rng: random.Random) -> bytes:
+    items = [
+        {
+            "id": 1_000_000 + i,
+            "title": _title(rng, i),
+            "brief": _text(rng, rng.randint(60, 160)),
+            "ctime": 1_760_000_000 + i * 60,
+            "reading_num": rng.randrange(100_000),
+            "source": {"name": "财联社"},
+            "is_ad": 0,
+            "subjects": [{"subject_name": _text(rng, 4)} for _ in range(rng.randint(0, 3))],
+            "images": [f"https://img.cls.cn/{i}.png"],
+        }
+        for i in range(n)
+    ]
+    data = {"errno": 0, "msg": "OK", "data": {"top_article": items[:3], "depth_list": items[3:]}}
+    return json.dumps(data, ensure_ascii=False).encode()
+
+
+def make_jin10(n: int, rng: random.Random) -> bytes:
+    chrome = "".join(
+        f'<div class="nav-item"><a href="/c/{i}">{_text(rng, 4)}</a></div>' for i in range(200)
+    )
+    html = (
+        "<!doctype html><html><head><meta charset=\"utf-8\"><title>金十数据</title>"
+        f"<link rel=\"stylesheet\" href=\"/_nuxt/app.css\"></head><body><div id=\"__nuxt\">{chrome}</div>"
+        f"<script>window.__NUXT__={make_nuxt_iife(n)};</script>"
+        "<script src=\"/_nuxt/runtime.js\" defer></script>"
+        "<script src=\"/_nuxt/app.js\" defer></script></body></html>"
+    )
+    return html.encode()
+
+
+def make_futu(n: int, rng: random.Random) -> bytes:
+    rows = "".join(
+        "<tr>"
+        f"<td align=\"center\">{i + 1}.</td>"
+        "<td><img src=\"/static/images/icon.png\"></td>"
+        f"<td class=\"al\"><a href=\"https://news.futunn.com/post/{2_000_000 + i}\" target=\"_blank\""
+        f" rel=\"nofollow\" itemid=\"{i}\">{escape(_title(rng, i))}</a>"
+        f"<div class=\"item-desc\">{_text(rng, 4)}</div></td>"
+        f"<td>{rng.randrange(10_000)}</td>"
+        "</tr>"
+        for i in range(n)
+    )
+    html = (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>富途牛牛 - 今日热榜</title></head>"
+        "<body><div class=\"c-d c-d-e\"><div class=\"Zd-p-Sc\"><div class=\"cc-dc-c\">"
+        f"<table class=\"table\"><tbody>{rows}</tbody></table>"
+        "</div></div></div><footer>TopHub</footer></body></html>"
+    )
+    return html.encode()
+
+
+def make_eastmoney_news(n: int, rng: random.Random) -> bytes:
+    items = [
+        {
+            "code": f"2026{i:012d}",
+            "title": _title(rng, i),
+            "summary": _text(rng, rng.randint(60, 160)),
+            "showTime": "2026-01-01 08:00:00",
+            "url": f"https://finance.eastmoney.com/a/2026{i:012d}.html",
+            "mediaName": _text(rng, 4),
+            "image": [],
+        }
+        for i in range(n)
+    ]
+    data = {"code": "1", "message": "success", "data": {"list": items, "page_index": 1, "total_hits": n}}
+    return f"cb({json.dumps(data, ensure_ascii=False)})".encode()
+
+
+def make_eastmoney_guba(n: int, rng: random.Random) -> bytes:
+    topics = [
+        {
+            "htid": 10_000 + i,
+            "nickname": _title(rng, i),
+            "desc": _text(rng, rng.randint(40, 120)),
+            "clickNumber": rng.randrange(10_000_000),
+            "postNumber": rng.randrange(10_000),
+            "recomStock": [{"name": _text(rng, 4), "code": f"{600000 + j}"} for j in range(rng.randint(0, 6))],
+        }
+        for i in range(n)
+    ]
+    return json.dumps({"re": topics, "rc": 1, "me": ""}, ensure_ascii=False).encode()
+
+
+# name -> (scraper class, fixture builder, URL the scraper requests, content type)
+SOURCES = {
+    "cls": (CLSScraper, make_cls, CLS_API_URL, "application/json"),
+    "jin10": (Jin10Scraper, make_jin10, JIN10_URL, "text/html; charset=utf-8"),
+    "futu": (FutuScraper, make_futu, FUTU_URL, "text/html; charset=utf-8"),
+    "eastmoney_news": (EastmoneyNewsScraper, make_eastmoney_news, EASTMONEY_NEWS_API_URL, "text/javascript"),
+    "eastmoney_guba": (EastmoneyGubaScraper, make_eastmoney_guba, EASTMONEY_GUBA_API_URL, "application/json"),
+}
+
+
+def make_fixtures(scale: int, seed: int = 0) -> dict[str, bytes]:
+    """Response body per source at `scale` times the usual article count."""
+    rng = random.Random(seed)
+    return {name: builder(BASE_COUNTS[name] * scale, rng) for name, (_, builder, _, _) in SOURCES.items()}
+
+
+def replay_client(fixtures: dict[str, bytes]) -> httpx.Client:
+    """A client answering each source's URL (query ignored) with its fixture."""
+    routes = {}
+    for name, body in fixtures.items():
+        _, _, url, content_type = SOURCES[name]
+        routes[httpx.URL(url).copy_with(query=None)] = (body, content_type)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body, content_type = routes[request.url.copy_with(query=None)]
+        return httpx.Response(200, content=body, headers={"Content-Type": content_type})
+
+    return create_client(transport=httpx.MockTransport(handler))
+
+
+def make_response(articles, size_per_title: int = 3, seed: int = 0) -> tuple[str, dict[str, str]]:
+    """An LLM-style topic response mentioning a sample of the titles."""
+    rng = random.Random(seed)
+    title_url_map = {a.title: a.url for a in articles if a.url}
+    titles = list(title_url_map)
+    parts = []
+    for i in range(max(len(titles) // size_per_title, 1)):
+        picked = rng.sample(titles, min(size_per_title, len(titles)))
+        parts.append(
+            f"### 选题{i + 1}：{_text(rng, 12)}\n\n"
+            f"- **核心角度**：{_text(rng, 40)}\n"
+            f"- **素材来源**：{'、'.join(picked)}\n\n---\n\n"
+        )
+    return "".join(parts), title_url_map
+
+
+def _measure(fn, repeat: int) -> tuple[float, int, object]:
+    """Best wall time over `repeat` calls, then peak traced bytes of one more."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak, result
+
+
+def _row(stage: str, scale: int, seconds: float, peak: int, items: int, size: int = 0) -> str:
+    rate = f"{items / seconds:>10.0f} art/s" if seconds else f"{'-':>10} art/s"
+    mb = f"{size / seconds / 1e6:>8.1f} MB/s" if size and seconds else f"{'':>13}"
+    return (f"{stage:<22} {scale:>4}x {items:>7} {seconds * 1000:>10.2f} ms "
+            f"{rate} {mb} {peak / 1e6:>9.2f} MB peak")
+
+
+def run_scale(scale: int, repeat: int, workdir: str, sources: list[str]) -> None:
+    fixtures = make_fixtures(scale)
+    client = replay_client({name: fixtures[name] for name in sources})
+    validators = ValidatorStore(f"{workdir}/http_validators.json")
+    articles = []
+    try:
+        for name in sources:
+            scraper = SOURCES[name][0](client=client, validators=validators)
+
+            def fetch(scraper=scraper):
+                found, errors = scraper.fetch()
+                if errors:
+                    raise RuntimeError(errors[0])
+                return found
+
+            seconds, peak, found = _measure(fetch, repeat)
+            articles.extend(found)
+            print(_row(f"scrape:{name}", scale, seconds, peak, len(found), len(fixtures[name])))
+    finally:
+        client.close()
+
+    scorer = KeywordScorer()
+    seconds, peak, _ = _measure(lambda: tag_precious_metals(articles, scorer), repeat)
+    print(_row("tag_precious_metals", scale, seconds, peak, len(articles)))
+
+    text, title_url_map = make_response(articles)
+    seconds, peak, _ = _measure(lambda: _linkify_titles(text, title_url_map), repeat)
+    print(_row("_linkify_titles", scale, seconds, peak, len(title_url_map), len(text.encode())))
+
+    seconds, peak, _ = _measure(lambda: formatter.generate_report(articles, []), repeat)
+    print(_row("generate_report", scale, seconds, peak, len(articles)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--sources", nargs="+", choices=list(SOURCES), default=list(SOURCES))
+    args = parser.parse_args()
+
+    sources = list(args.sources)
+    if "jin10" in sources and not shutil.which("node"):
+        print("node not found, skipping jin10")
+        sources.remove("jin10")
+
+    workdir = tempfile.mkdtemp(prefix="hotnews-bench-")
+    formatter.OUTPUT_DIR = workdir
+    formatter.article_store = ArticleStore(f"{workdir}/hotnews.db")
+    try:
+        print(f"{'stage':<22} {'scale':>5} {'items':>7} {'best':>13} {'throughput':>15} "
+              f"{'':>13} {'memory':>14}")
+        for scale in args.scales:
+            run_scale(scale, args.repeat, workdir, sources)
+            print()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Load benchmark — /api/progress latency while a pipeline run is in flight.
+
+Starts the server in-process on an ephemeral port, submits a run through
+POST /api/run (the pipeline is replaced by a stub that sleeps and reports
+progress, so no network is touched), then hammers /api/progress from several
+keep-alive clients and reports latency percentiles.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_server
+    python -m benchmarks.bench_server --server single --clients 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer
+
+import httpx
+
+import server
+
+
+def _fake_pipeline(run_seconds: float):
+    def run_pipeline(user_profile="", persona_name="", progress=None, **kwargs):
+        steps = 8
+        for i in range(steps):
+            progress(i + 1, steps, f"模拟步骤 {i + 1}")
+            time.sleep(run_seconds / steps)
+        return server.HOTNEWS_ARTICLES
+    return run_pipeline
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def _poll(base_url: str, requests_per_client: int) -> list[float]:
+    latencies = []
+    with httpx.Client(base_url=base_url, timeout=60) as client:
+        for _ in range(requests_per_client):
+            start = time.perf_counter()
+            client.get("/api/progress").raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--server", choices=["pooled", "single"], default="pooled",
+                        help="pooled = PooledHTTPServer, single = plain HTTPServer")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    parser.add_argument("--run-seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    server.pipeline.run_pipeline = _fake_pipeline(args.run_seconds)
+    server.Handler.log_message = lambda *a: None
+    if args.server == "pooled":
+        httpd = server.PooledHTTPServer(("127.0.0.1", 0), server.Handler)
+    else:
+        httpd = HTTPServer(("127.0.0.1", 0), server.Handler)
+    base_url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+    try:
+        resp = httpx.post(f"{base_url}/api/run", json={}, timeout=60)
+        print(f"POST /api/run -> {resp.status_code} {resp.json()}")
+        job_url = f"{base_url}/api/jobs/{resp.json()['job_id']}"
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.clients) as pool:
+            results = list(pool.map(lambda _: _poll(base_url, args.requests), range(args.clients)))
+        elapsed = time.perf_counter() - start
+
+        # A run that failed at once leaves an idle server, not one under load
+        job = httpx.get(job_url, timeout=60).json()
+        if job["status"] == "failed":
+            raise SystemExit(f"pipeline job failed, latencies not meaningful: {job['error']}")
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        server._executor.shutdown(wait=True)
+
+    latencies = [ms for client in results for ms in client]
+    print(f"server={args.server} clients={args.clients} requests={len(latencies)} "
+          f"wall={elapsed:.2f}s throughput={len(latencies) / elapsed:.0f} req/s")
+    print(f"latency ms: p50={statistics.median(latencies):.2f} "
+          f"p95={_percentile(latencies, 95):.2f} "
+          f"p99={_percentile(latencies, 99):.2f} max={max(latencies):.2f}")
+
+
+if __name__ == "__main__":
+    main()
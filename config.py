@@ -1,11 +1,29 @@
 """Configuration constants for the precious metals news aggregator."""
 
+import os
+
 _COMMON_UA = (
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
     "AppleWebKit/537.36 (KHTML, like Gecko) "
     "Chrome/131.0.0.0 Safari/537.36"
 )
 
+# --- Shared HTTP client ---
+# Headers sent with every request; per-source headers below override them
+HTTP_DEFAULT_HEADERS = {
+    "User-Agent": _COMMON_UA,
+    "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+}
+# Negotiate HTTP/2 when the optional h2 package is installed
+HTTP_HTTP2 = True
+HTTP_MAX_CONNECTIONS = 20
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 10
+# Seconds an idle pooled connection is kept open
+HTTP_KEEPALIVE_EXPIRY = 60
+HTTP_TIMEOUT = 15
+# Send If-None-Match / If-Modified-Since and reuse the last parse on 304
+CONDITIONAL_GET = True
+
 # --- CLS (财联社) 头条 ---
 CLS_API_URL = "https://www.cls.cn/v3/depth/home/assembled/1000"
 CLS_API_PARAMS = {
@@ -27,12 +45,26 @@ JIN10_HEADERS = {
     "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
 }
 
+# Seconds allowed for the resident Node.js worker to evaluate the NUXT payload
+NODE_EVAL_TIMEOUT = 10
+
+# --- Playwright fallback ---
+# Resource types the warm browser never downloads
+PLAYWRIGHT_BLOCKED_RESOURCES = ("image", "font", "stylesheet", "media")
+# Milliseconds to wait for window.__NUXT__ before parsing the DOM instead
+PLAYWRIGHT_NUXT_TIMEOUT = 10000
+# Seconds a caller waits for one browser task
+PLAYWRIGHT_TASK_TIMEOUT = 60
+
 # --- Futu (富途) via TopHub ---
 FUTU_URL = "https://tophub.today/n/YKd60rzoaP"
 FUTU_HEADERS = {
     "User-Agent": _COMMON_UA,
     "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
 }
+# HTML parser for the TopHub page: "auto" uses the first installed of
+# "selectolax", "lxml" and "bs4" (always available)
+FUTU_HTML_PARSER = "auto"
 
 # --- Eastmoney 资讯精华 ---
 EASTMONEY_NEWS_API_URL = "https://np-listapi.eastmoney.com/comm/web/getNewsByColumns"
@@ -95,5 +127,155 @@ PRECIOUS_METALS_KEYWORDS = [
     "precious metal",
 ]
 
+# --- Keyword categories ---
+# Named keyword sets scored in one pass by filters.KeywordScorer. A keyword
+# is a string (weight 1.0) or a (keyword, weight) pair; the category score
+# is the category weight times the summed weights of distinct matched
+# keywords, with title matches counted KEYWORD_TITLE_BOOST times.
+KEYWORD_CATEGORIES = {
+    "precious_metals": {"weight": 1.0, "keywords": PRECIOUS_METALS_KEYWORDS},
+    "fx": {
+        "weight": 1.0,
+        "keywords": [
+            "汇率", "人民币", "美元指数", "离岸人民币", "日元", "欧元", "英镑",
+            "外汇", "外储", ("汇率贬值", 1.5), ("汇率升值", 1.5),
+            "DXY", "USD", "CNH", "forex",
+        ],
+    },
+    "rates": {
+        "weight": 1.0,
+        "keywords": [
+            ("降息", 1.5), ("加息", 1.5), "利率", "美联储", "央行", "LPR", "MLF",
+            "国债收益率", "美债", "逆回购", "降准", "议息", "点阵图",
+            "Fed", "FOMC", "Treasury",
+        ],
+    },
+    "crypto": {
+        "weight": 1.0,
+        "keywords": [
+            "比特币", "以太坊", "加密货币", "数字货币", "稳定币", "区块链",
+            "Bitcoin", "BTC", "ETH", "crypto",
+        ],
+    },
+    "energy": {
+        "weight": 1.0,
+        "keywords": [
+            "原油", "油价", "天然气", "欧佩克", "布伦特", "WTI", "OPEC", "成品油",
+        ],
+    },
+}
+KEYWORD_TITLE_BOOST = 2.0
+
+# --- Scraping ---
+# Per-source fetch timeout (seconds); sources not listed use the default.
+# Jin10 may fall back to Playwright, so it gets a longer budget.
+SCRAPER_TIMEOUT = 45
+SCRAPER_TIMEOUTS = {
+    "金十": 90,
+}
+# Minimum gap between two requests to the same host (seconds)
+SCRAPER_HOST_DELAY = 1.5
+
+# --- Article snapshots ---
+# A successful fetch is reused for this many seconds before the source is
+# scraped again; sources not listed use the default. 0 disables caching.
+SNAPSHOT_TTL = 300
+SNAPSHOT_TTLS = {
+    "富途": 600,
+    "东方财富股吧": 900,
+}
+
+# --- Article database ---
+# Articles first seen within this many seconds count as new and are flagged
+# in the LLM prompt; the index forgets articles unseen for the retention.
+ARTICLE_NEW_WINDOW = 2 * 3600
+ARTICLE_INDEX_RETENTION = 30 * 24 * 3600
+# Scrape runs kept in the article store for historical queries
+ARTICLE_STORE_RETENTION = 90 * 24 * 3600
+
+# --- Near-duplicate clustering ---
+# Headlines whose character n-gram sets have at least this Jaccard
+# similarity are merged into one canonical article
+DEDUP_ENABLED = True
+DEDUP_THRESHOLD = 0.5
+DEDUP_NGRAM = 2
+# MinHash signature length and LSH bands (rows per band = perm / bands)
+DEDUP_NUM_PERM = 48
+DEDUP_BANDS = 16
+
+# --- LLM ---
+# Per-request timeout for one model attempt (seconds)
+LLM_TIMEOUT = 120
+# Launch the next model in the pool if no answer arrived within this many
+# seconds; the first valid response wins. Streamed calls race to the first
+# token, full completions to the whole answer (typically 30-60 s)
+LLM_HEDGE_DELAY = 20
+LLM_HEDGE_DELAY_FULL = 90
+# Model attempts running at once across all callers and batch personas,
+# abandoned hedges included (they run until their request ends). Hedges
+# are skipped while every slot is taken
+LLM_MAX_IN_FLIGHT = 6
+# Stream completions so each 选题 reaches the file and the UI as it is written
+LLM_STREAM = True
+# On-disk cache of completions keyed by prompt + model + temperature
+LLM_CACHE_ENABLED = True
+LLM_CACHE_MAX_AGE = 6 * 3600
+LLM_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# --- Persona relevance prefilter ---
+# Only the RELEVANCE_TOP_N articles closest to a persona profile (character
+# n-gram TF-IDF cosine) are offered to the prompt builder. 0 disables.
+RELEVANCE_TOP_N = 150
+RELEVANCE_NGRAMS = (2, 3)
+
+# --- Prompt assembly ---
+# Approximate token budget for the whole recommendation prompt; the
+# best-ranked headlines are packed until it is spent. 0 sends everything.
+LLM_PROMPT_TOKEN_BUDGET = 12000
+# Ranking weights for headlines competing for the budget
+PROMPT_WEIGHTS = {
+    "precious_metals": 2.0,
+    "hits": 1.0,
+    "recency": 1.0,
+    "relevance": 3.0,
+    "new": 0.5,
+    "sources": 0.5,
+}
+# Age (seconds) at which a headline's recency score halves
+PROMPT_RECENCY_HALF_LIFE = 6 * 3600
+
+# --- Batch generation ---
+# Concurrent LLM calls when generating for every persona in profiles.csv
+LLM_BATCH_CONCURRENCY = 4
+
+# --- Server ---
+# Pipeline runs executed concurrently by the in-process job engine
+JOB_WORKERS = 2
+# Finished jobs kept in memory for /api/jobs
+JOB_HISTORY = 50
+# Threads serving HTTP connections; extra connections wait in the queue
+HTTP_WORKERS = 16
+# Idle seconds before a keep-alive connection is closed, freeing its worker
+HTTP_KEEPALIVE_TIMEOUT = 15
+# Concurrent /api/jobs/<id>/stream clients. Each holds an HTTP worker while
+# open, so further ones get 503 and the page falls back to polling
+SSE_MAX_STREAMS = 4
+# Seconds between heartbeats on an idle stream; a dead client fails the write
+SSE_HEARTBEAT = 15
+# Seconds before a stream is closed anyway; EventSource reconnects and
+# resumes after Last-Event-ID
+SSE_MAX_DURATION = 300
+# Rendered /api/markdown pages kept in memory (one per persona)
+MARKDOWN_CACHE_ENTRIES = 32
+
 # --- Output ---
-OUTPUT_DIR = "output"
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output")
+SNAPSHOT_DIR = os.path.join(OUTPUT_DIR, "snapshots")
+HTTP_VALIDATORS_FILE = os.path.join(OUTPUT_DIR, "http_validators.json")
+LLM_STATS_FILE = os.path.join(OUTPUT_DIR, "llm_stats.json")
+LLM_CACHE_DIR = os.path.join(OUTPUT_DIR, "llm_cache")
+DB_PATH = os.path.join(OUTPUT_DIR, "hotnews.db")
+# One JSON file of stage timings per run; /api/metrics aggregates the newest
+METRICS_DIR = os.path.join(OUTPUT_DIR, "metrics")
+METRICS_HISTORY = 200
+PROFILES_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles.csv")
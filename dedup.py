@@ -0,0 +1,162 @@
+"""Cross-source near-duplicate clustering of headlines.
+
+Titles are normalized and split into character n-grams, which suit Chinese
+headlines that have no word boundaries. MinHash signatures are bucketed
+with LSH banding to find candidate pairs without comparing every pair;
+candidates are confirmed with the exact Jaccard similarity of their
+n-gram sets and joined into clusters with union-find.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import struct
+import unicodedata
+from collections import defaultdict
+
+from config import DEDUP_BANDS, DEDUP_NGRAM, DEDUP_NUM_PERM, DEDUP_THRESHOLD
+from scrapers.base import Article
+
+# Bracketed prefixes such as 【快讯】 or [视频] are labels, not content
+_LABEL = re.compile(r"^\s*(【[^】]{0,12}】|\[[^\]]{0,12}\])\s*")
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase, fold full-width forms and drop labels, punctuation and
+    whitespace so that only the wording is compared."""
+    text = unicodedata.normalize("NFKC", title).lower()
+    text = _LABEL.sub("", text)
+    return "".join(ch for ch in text if ch.isalnum())
+
+
+def shingles(title: str, n: int = DEDUP_NGRAM) -> frozenset[str]:
+    text = normalize_title(title)
+    if len(text) <= n:
+        return frozenset([text]) if text else frozenset()
+    return frozenset(text[i:i + n] for i in range(len(text) - n + 1))
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    inter = len(a & b)
+    return inter / (len(a) + len(b) - inter)
+
+
+class MinHasher:
+    """MinHash signatures with num_perm independent 32-bit hash functions.
+
+    The functions are the consecutive 32-bit words of a SHAKE-128 digest of
+    the shingle, so all of them come from one C call per shingle, and the
+    per-function minimum is taken with zip/min rather than a Python loop.
+    Digests are memoized per shingle; signatures are stable across runs.
+    """
+
+    def __init__(self, num_perm: int = DEDUP_NUM_PERM):
+        self.num_perm = num_perm
+        self._unpack = struct.Struct(f"<{num_perm}I").unpack
+        self._cache: dict[str, tuple[int, ...]] = {}
+
+    def _hashes(self, shingle: str) -> tuple[int, ...]:
+        hashes = self._cache.get(shingle)
+        if hashes is None:
+            digest = hashlib.shake_128(shingle.encode("utf-8")).digest(4 * self.num_perm)
+            hashes = self._cache[shingle] = self._unpack(digest)
+        return hashes
+
+    def signature(self, shingle_set: frozenset[str]) -> tuple[int, ...]:
+        if not shingle_set:
+            return ()
+        return tuple(map(min, zip(*map(self._hashes, shingle_set))))
+
+
+def cluster_titles(
+    titles: list[str],
+    threshold: float = DEDUP_THRESHOLD,
+    num_perm: int = DEDUP_NUM_PERM,
+    bands: int = DEDUP_BANDS,
+    ngram: int = DEDUP_NGRAM,
+) -> list[list[int]]:
+    """Group indices of near-duplicate titles. Returns every cluster,
+    singletons included, each sorted and ordered by first member."""
+    sets = [shingles(t, ngram) for t in titles]
+    hasher = MinHasher(num_perm)
+    rows = max(num_perm // bands, 1)
+
+    parent = list(range(len(titles)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    buckets: dict[tuple, list[int]] = defaultdict(list)
+    for i, shingle_set in enumerate(sets):
+        sig = hasher.signature(shingle_set)
+        if not sig:
+            continue
+        for band in range(bands):
+            chunk = sig[band * rows:(band + 1) * rows]
+            if chunk:
+                buckets[(band, chunk)].append(i)
+
+    checked: set[tuple[int, int]] = set()
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        for x in range(len(members)):
+            for y in range(x + 1, len(members)):
+                i, j = members[x], members[y]
+                if (i, j) in checked:
+                    continue
+                checked.add((i, j))
+                ri, rj = find(i), find(j)
+                if ri != rj and jaccard(sets[i], sets[j]) >= threshold:
+                    parent[max(ri, rj)] = min(ri, rj)
+
+    clusters: dict[int, list[int]] = defaultdict(list)
+    for i in range(len(titles)):
+        clusters[find(i)].append(i)
+    return sorted(clusters.values(), key=lambda c: c[0])
+
+
+def dedupe_articles(articles: list[Article], **kwargs) -> tuple[list[Article], int]:
+    """Collapse near-duplicate articles into one canonical article each.
+
+    The canonical copy is the most-read one (then the one with the longest
+    summary, then the first scraped); the other copies are listed in its
+    `related` field and their tags and keyword scores are merged into it. Returns the
+    canonical articles in original order and the number of clusters that
+    had more than one member.
+    """
+    clusters = cluster_titles([a.title for a in articles], **kwargs)
+    canonical: list[tuple[int, Article]] = []
+    merged = 0
+    for members in clusters:
+        copies = [articles[i] for i in members]
+        if len(copies) == 1:
+            canonical.append((members[0], copies[0]))
+            continue
+        merged += 1
+        best_pos = max(
+            range(len(copies)),
+            key=lambda k: (copies[k].hits, len(copies[k].summary), -members[k]),
+        )
+        best = copies[best_pos]
+        for k, other in enumerate(copies):
+            if k == best_pos:
+                continue
+            best.related.append({"source": other.source, "title": other.title, "url": other.url})
+            best.related.extend(other.related)
+            for tag in other.tags:
+                if tag not in best.tags:
+                    best.tags.append(tag)
+            for category, score in other.scores.items():
+                best.scores[category] = max(best.scores.get(category, 0.0), score)
+        best.is_precious_metals = any(a.is_precious_metals for a in copies)
+        best.is_new = all(a.is_new for a in copies)
+        canonical.append((members[best_pos], best))
+    canonical.sort(key=lambda item: item[0])
+    return [a for _, a in canonical], merged
@@ -1,33 +1,188 @@
-"""Keyword matching to tag precious-metals-related articles."""
+"""Keyword matching to tag and score articles by topic category."""
 
 from __future__ import annotations
 
+import hashlib
+import json
 import re
+from bisect import bisect_right
 
-from config import PRECIOUS_METALS_KEYWORDS
+from config import KEYWORD_CATEGORIES, KEYWORD_TITLE_BOOST
 from scrapers.base import Article
 
-# Build a single compiled regex from all keywords (case-insensitive)
-_PATTERN = re.compile(
-    "|".join(re.escape(kw) for kw in PRECIOUS_METALS_KEYWORDS),
-    re.IGNORECASE,
-)
+# Texts are scored in batches joined into one string, so the regex runs over
+# the whole batch in a single C-level pass instead of once per article
+_BATCH_SIZE = 5000
+# Separates texts in a batch; never part of a keyword
+_SEP = "\x00"
+# Part of keyword_signature(); bump when KeywordScorer's matching rules
+# change so articles tagged by the old rules are tagged again.
+# 2: trie scorer with whole-word ASCII and longest-match keywords
+# 3: whole-word ASCII keywords also match their plural ("precious metals")
+SCORER_VERSION = 3
 
 
-def tag_precious_metals(articles: list[Article]) -> list[Article]:
-    """Scan each article's title + summary for precious metals keywords.
-    Sets is_precious_metals=True and adds matched keywords to tags.
+class KeywordScorer:
+    """Scores texts against several named keyword sets in one pass.
+
+    All keywords of all categories are compiled into one regex shaped as a
+    trie of their lowercased forms, which lets the regex engine skip ahead
+    to possible first characters and never backtracks across alternatives;
+    the longest keyword wins at a position. A batch of titles and summaries
+    is joined, lowercased and scanned once; match offsets are mapped back
+    to their article with bisect.
+
+    Two rules differ from the single-alternation regex tag_precious_metals
+    used before, and change some tags (benchmarks.bench_keywords lists them
+    on a headline set):
+
+    - ASCII keywords only count as whole words (or with a plural "s"), so
+      "gold" no longer matches in "Goldman", "GLD" in "GLDM" or "silver" in
+      "Silvergate".
+    - Overlapping keywords resolve to the longest one at a position, so
+      "黄金期货" tags 黄金期货 rather than the earlier-listed 黄金.
+    """
+
+    def __init__(self, categories: dict = KEYWORD_CATEGORIES, title_boost: float = KEYWORD_TITLE_BOOST):
+        self.categories = list(categories)
+        self.title_boost = title_boost
+        # Lowercased keyword -> [(category, weight)]; a keyword may sit in several sets
+        self._keywords: dict[str, list[tuple[str, float]]] = {}
+        for name, spec in categories.items():
+            category_weight = spec.get("weight", 1.0)
+            for kw in spec["keywords"]:
+                keyword, weight = (kw, 1.0) if isinstance(kw, str) else kw
+                self._keywords.setdefault(keyword.lower(), []).append(
+                    (name, category_weight * weight)
+                )
+        self._pattern = re.compile(_trie_pattern(self._keywords) or r"(?!)")
+        # For the rare text whose lowercase form changes length
+        self._fallback = re.compile(
+            "|".join(re.escape(k) for k in sorted(self._keywords, key=len, reverse=True)) or r"(?!)",
+            re.IGNORECASE,
+        )
+
+    def score(self, titles: list[str], summaries: list[str] | None = None) -> list[tuple[dict, dict]]:
+        """Return one (scores, matches) pair per text: scores maps category to
+        its weighted score, matches maps category to the matched keywords as
+        they appear in the text, distinct and in order of appearance. Only
+        categories with a match are present."""
+        summaries = summaries if summaries is not None else [""] * len(titles)
+        results: list[tuple[dict, dict]] = []
+        for start in range(0, len(titles), _BATCH_SIZE):
+            results.extend(
+                self._score_batch(titles[start:start + _BATCH_SIZE], summaries[start:start + _BATCH_SIZE])
+            )
+        return results
+
+    def _score_batch(self, titles: list[str], summaries: list[str]) -> list[tuple[dict, dict]]:
+        # Segment 2i is article i's title, 2i + 1 its summary
+        parts: list[str] = []
+        offsets: list[int] = []
+        pos = 0
+        for title, summary in zip(titles, summaries):
+            for text in (title, summary):
+                offsets.append(pos)
+                parts.append(text)
+                pos += len(text) + 1
+        batch = _SEP.join(parts)
+        lowered = batch.lower()
+        if len(lowered) == len(batch):
+            matches_iter = self._pattern.finditer(lowered)
+        else:
+            lowered = batch
+            matches_iter = self._fallback.finditer(batch)
+
+        results: list[tuple[dict, dict]] = [({}, {}) for _ in titles]
+        seen: list[set] = [set() for _ in titles]
+        for m in matches_iter:
+            start, end = m.span()
+            keyword = m.group().lower()
+            if keyword.isascii() and not _is_whole_word(lowered, start, end):
+                continue
+            article, part = divmod(bisect_right(offsets, start) - 1, 2)
+            text = batch[start:end]
+            # Titles precede summaries, so a keyword's first hit decides the boost
+            boost = self.title_boost if part == 0 else 1.0
+            scores, matches = results[article]
+            for category, weight in self._keywords[keyword]:
+                key = (category, keyword)
+                if key in seen[article]:
+                    continue
+                seen[article].add(key)
+                scores[category] = scores.get(category, 0.0) + weight * boost
+                matches.setdefault(category, []).append(text)
+        return results
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isascii() and ch.isalnum()
+
+
+def _is_whole_word(text: str, start: int, end: int) -> bool:
+    """Whether text[start:end], or it plus a plural "s", is a whole word."""
+    if start and _is_word_char(text[start - 1]):
+        return False
+    if text.startswith("s", end):
+        end += 1
+    return end == len(text) or not _is_word_char(text[end])
+
+
+def _trie_pattern(keywords) -> str:
+    """Regex matching any of the (lowercased) keywords, nested by common
+    prefix: ["金价", "金矿", "黄金"] -> "(?:金(?:价|矿)|黄金)"."""
+    root: dict = {}
+    for keyword in keywords:
+        node = root
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if "" in node:
+            # A keyword ends here; the longer continuations are tried first
+            return f"(?:{body})?" if len(branches) == 1 else f"{body}?"
+        return body
+
+    return build(root)
+
+
+_scorer: KeywordScorer | None = None
+
+
+def get_scorer() -> KeywordScorer:
+    """Return the scorer for KEYWORD_CATEGORIES, building it on first use."""
+    global _scorer
+    if _scorer is None:
+        _scorer = KeywordScorer()
+    return _scorer
+
+
+def keyword_signature(categories: dict = KEYWORD_CATEGORIES, title_boost: float = KEYWORD_TITLE_BOOST) -> str:
+    """Short hash of the keyword configuration and SCORER_VERSION. Tags
+    stored under another signature are stale and must be recomputed (see
+    storage.ArticleIndex)."""
+    material = json.dumps([SCORER_VERSION, categories, title_boost], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(material.encode("utf-8")).hexdigest()[:16]
+
+
+def tag_precious_metals(articles: list[Article], scorer: KeywordScorer | None = None) -> list[Article]:
+    """Scan each article's title + summary for keywords of every category.
+    Sets article.scores, and for precious-metals matches sets
+    is_precious_metals=True and adds the matched keywords to tags.
     All articles are kept; matching ones are just tagged."""
-    for article in articles:
-        text = f"{article.title} {article.summary}"
-        matches = _PATTERN.findall(text)
-        if matches:
+    scorer = scorer or get_scorer()
+    results = scorer.score([a.title for a in articles], [a.summary for a in articles])
+    for article, (scores, matches) in zip(articles, results):
+        article.scores = {name: round(value, 3) for name, value in scores.items()}
+        metals = matches.get("precious_metals")
+        if metals:
             article.is_precious_metals = True
-            # Deduplicate matched keywords (preserve order)
-            seen = set()
-            for m in matches:
-                lower = m.lower() if m.isascii() else m
-                if lower not in seen:
-                    seen.add(lower)
+            for m in metals:
+                if m not in article.tags:
                     article.tags.append(m)
     return articles
@@ -3,11 +3,22 @@
 from __future__ import annotations
 
 import os
+import sqlite3
+import threading
+import uuid
 from collections import defaultdict
 from datetime import datetime
 
 from config import OUTPUT_DIR
 from scrapers.base import Article
+from storage import ArticleStore, article_store
+
+# One lock per recommendations file: a streamed report is appended for the
+# whole LLM call, and another run for the same persona must not interleave
+_report_locks: dict[str, threading.Lock] = defaultdict(threading.Lock)
+_report_locks_guard = threading.Lock()
+# Streamed report path -> backup of the report it replaces ("" if none)
+_streams: dict[str, str] = {}
 
 
 def generate_report(
@@ -16,45 +27,163 @@ def generate_report(
     topics_md: str = "",
     user_profile: str = "",
     persona_name: str = "",
+    streamed_path: str = "",
 ) -> str:
-    """Generate markdown report and save to output/ directory. Returns the file path."""
-    today = datetime.now().strftime("%Y-%m-%d")
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    """Generate markdown report and save to output/ directory. Returns the file path.
+    streamed_path is a recommendations file already streamed and finished
+    for this run; it is returned as is instead of being rewritten."""
+    # Always generate/update the articles data file
+    articles_filepath = write_articles_report(articles, errors)
+
+    if streamed_path:
+        return streamed_path
+
+    # If we have a persona with topics, save the recommendations to a separate file
+    if persona_name and topics_md:
+        return write_recommendations(topics_md, persona_name)
+
+    # If no persona, just return the articles file path
+    return articles_filepath
 
+
+def write_articles_report(
+    articles: list[Article],
+    errors: list[str],
+    store: ArticleStore | None = None,
+) -> str:
+    """Save the run to the article store and write output/hotnews_articles.md
+    from it. Falls back to the in-memory articles if the store is
+    unavailable. Returns the file path."""
+    store = store or article_store
+    try:
+        run_id = store.save_run(articles, errors)
+    except sqlite3.Error as e:
+        print(f"文章库写入失败，直接生成报告: {e}")
+        return _write_articles_file(articles, errors)
+    return write_run_report(run_id, store)
+
+
+def write_run_report(run_id: int | None = None, store: ArticleStore | None = None) -> str:
+    """Write output/hotnews_articles.md for a stored run (default: the
+    latest). Returns the file path."""
+    store = store or article_store
+    run = store.run(run_id)
+    if run is None:
+        return _write_articles_file([], [])
+    return _write_articles_file(store.articles(run_id=run["id"]), run["errors"])
+
+
+def _write_articles_file(articles: list[Article], errors: list[str]) -> str:
     # Group articles by source
     by_source: dict[str, list[Article]] = defaultdict(list)
     for a in articles:
         by_source[a.source].append(a)
 
-    # Always generate/update the articles data file
     articles_filepath = os.path.join(OUTPUT_DIR, "hotnews_articles.md")
     articles_content = _generate_articles_section(by_source, errors)
 
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     with open(articles_filepath, "w", encoding="utf-8") as f:
         f.write(articles_content)
+    return articles_filepath
 
-    # If we have a persona with topics, save the recommendations to a separate file
-    if persona_name and topics_md:
-        recommendations_filepath = os.path.join(OUTPUT_DIR, f"hotnews_推荐_{persona_name}.md")
-
-        # Build recommendations content with header
-        rec_lines: list[str] = []
-        rec_lines.append(f"# 新闻日报 {today}")
-        rec_lines.append("")
-        rec_lines.append(f"> 生成时间: {timestamp}")
-        rec_lines.append("")
-        rec_lines.append(topics_md)
 
-        recommendations_content = "\n".join(rec_lines)
+def write_recommendations(topics_md: str, persona_name: str) -> str:
+    """Write output/hotnews_推荐_{persona_name}.md. Returns the file path."""
+    recommendations_filepath = _recommendations_path(persona_name)
+    recommendations_content = _recommendations_header() + topics_md
 
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    with _report_lock(recommendations_filepath):
         with open(recommendations_filepath, "w", encoding="utf-8") as f:
             f.write(recommendations_content)
 
-        return recommendations_filepath
+    return recommendations_filepath
+
+
+def start_recommendations(persona_name: str) -> str:
+    """Start streaming the persona's report in place, with just its header,
+    ready for append_recommendations(). The previous report is moved to a
+    backup unique to this run. End the stream with finish_recommendations(),
+    or discard_recommendations() to restore the previous report. Streams
+    (and writes) for the same persona wait for each other. Returns the
+    file path."""
+    filepath = _recommendations_path(persona_name)
+    lock = _report_lock(filepath)
+    lock.acquire()
+    try:
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        backup = ""
+        if os.path.exists(filepath):
+            backup = f"{filepath}.{uuid.uuid4().hex[:12]}.bak"
+            os.replace(filepath, backup)
+        with open(filepath, "w", encoding="utf-8") as f:
+            f.write(_recommendations_header())
+    except BaseException:
+        lock.release()
+        raise
+    _streams[filepath] = backup
+    return filepath
+
+
+def append_recommendations(filepath: str, section: str) -> None:
+    """Append one streamed section to a recommendations file."""
+    with open(filepath, "a", encoding="utf-8") as f:
+        f.write(section)
+
+
+def finish_recommendations(filepath: str) -> str:
+    """Keep a completed stream as the persona's report. Returns its path."""
+    backup = _streams.pop(filepath)
+    try:
+        if backup:
+            _remove_quietly(backup)
+    finally:
+        _report_lock(filepath).release()
+    return filepath
+
+
+def discard_recommendations(filepath: str) -> None:
+    """Roll back a failed or empty stream: the previous report (if any)
+    takes its place again."""
+    backup = _streams.pop(filepath)
+    try:
+        if backup:
+            os.replace(backup, filepath)
+        else:
+            _remove_quietly(filepath)
+    finally:
+        _report_lock(filepath).release()
+
+
+def _report_lock(filepath: str) -> threading.Lock:
+    with _report_locks_guard:
+        return _report_locks[filepath]
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _recommendations_path(persona_name: str) -> str:
+    return os.path.join(OUTPUT_DIR, f"hotnews_推荐_{persona_name}.md")
+
+
+def _recommendations_header() -> str:
+    today = datetime.now().strftime("%Y-%m-%d")
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    # If no persona, just return the articles file path
-    return articles_filepath
+    # Build recommendations header; the topics follow directly
+    rec_lines: list[str] = []
+    rec_lines.append(f"# 新闻日报 {today}")
+    rec_lines.append("")
+    rec_lines.append(f"> 生成时间: {timestamp}")
+    rec_lines.append("")
+    rec_lines.append("")
+    return "\n".join(rec_lines)
 
 
 def _generate_articles_section(by_source: dict, errors: list[str]) -> str:
@@ -90,6 +219,14 @@ def _generate_articles_section(by_source: dict, errors: list[str]) -> str:
                 lines.append(f"{_escape_md(a.summary)}")
                 lines.append("")
 
+            if a.related:
+                links = [
+                    f"[{r['source']}]({r['url']})" if r["url"] else r["source"]
+                    for r in a.related
+                ]
+                lines.append(f"🔗 **同题报道**: {'、'.join(links)}")
+                lines.append("")
+
             if a.is_precious_metals and a.tags:
                 lines.append(f"🏷️ **贵金属关键词**: {', '.join(a.tags)}")
                 lines.append("")
@@ -0,0 +1,476 @@
+"""LLM chat-completions client with hedged model selection over LLM_MODEL_POOL."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import queue
+import statistics
+import threading
+import time
+
+from config import (
+    LLM_CACHE_DIR,
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_MAX_AGE,
+    LLM_CACHE_MAX_BYTES,
+    LLM_HEDGE_DELAY,
+    LLM_HEDGE_DELAY_FULL,
+    LLM_MAX_IN_FLIGHT,
+    LLM_STATS_FILE,
+    LLM_TIMEOUT,
+)
+from scrapers.client import get_client
+
+# LLM Configuration - the API key comes from the environment (LLM_API_KEY)
+LLM_BASE_URL = "https://api.ephone.chat/v1/chat/completions"
+LLM_MODEL_POOL = [
+    "gemini-3-flash-preview",
+    "gemini-3-pro-preview",
+    "gpt-5.2",
+    "glm-4.7"
+]
+
+# Weight of the newest sample in the moving latency average
+_EWMA_ALPHA = 0.3
+
+# Held from an attempt's launch until its thread ends, so abandoned hedges
+# still count against LLM_MAX_IN_FLIGHT
+_attempt_slots = threading.BoundedSemaphore(LLM_MAX_IN_FLIGHT)
+
+
+class ModelStats:
+    """Per-model latency/success statistics, persisted as JSON so the pool
+    order adapts across runs."""
+
+    def __init__(self, path: str = LLM_STATS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict] | None = None
+
+    def _load(self) -> dict[str, dict]:
+        if self._stats is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._stats = json.load(f)
+            except (OSError, ValueError):
+                self._stats = {}
+        return self._stats
+
+    def _entry(self, model: str) -> dict:
+        return self._load().setdefault(model, {
+            "attempts": 0,
+            "successes": 0,
+            "failures": 0,
+            "latency_ewma": None,
+            "last_error": "",
+        })
+
+    def record(self, model: str, latency: float, error: Exception | None = None) -> None:
+        with self._lock:
+            entry = self._entry(model)
+            entry["attempts"] += 1
+            if error is None:
+                entry["successes"] += 1
+                prev = entry["latency_ewma"]
+                entry["latency_ewma"] = (
+                    latency if prev is None else _EWMA_ALPHA * latency + (1 - _EWMA_ALPHA) * prev
+                )
+            else:
+                entry["failures"] += 1
+                entry["last_error"] = f"{type(error).__name__}: {error}"[:200]
+            self._save()
+
+    def score(self, model: str, prior: float = LLM_HEDGE_DELAY) -> float:
+        """Expected seconds to a valid answer: smoothed latency divided by a
+        smoothed success rate. A model without a successful answer yet is
+        assumed to take `prior` seconds."""
+        with self._lock:
+            entry = self._load().get(model) or {"attempts": 0, "successes": 0, "latency_ewma": None}
+        latency = entry["latency_ewma"] if entry["latency_ewma"] is not None else prior
+        success_rate = (entry["successes"] + 1) / (entry["attempts"] + 2)
+        return latency / success_rate
+
+    def ordered(self, models: list[str]) -> list[str]:
+        """Models sorted by score; ties keep the configured order. Untried
+        models are assumed as slow as the median measured model of the pool,
+        so they don't overtake a primary that answers at the usual speed."""
+        with self._lock:
+            stats = self._load()
+            latencies = [
+                stats[m]["latency_ewma"] for m in models
+                if m in stats and stats[m]["latency_ewma"] is not None
+            ]
+        prior = statistics.median(latencies) if latencies else LLM_HEDGE_DELAY
+        return sorted(models, key=lambda m: self.score(m, prior))
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            return json.loads(json.dumps(self._load()))
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._stats, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+model_stats = ModelStats()
+
+
+class ResponseCache:
+    """Content-addressed cache of completions on disk.
+
+    The key is a hash of the request messages, temperature and model, so a
+    persona regenerated against an unchanged headline set is answered
+    without calling the LLM. Entries older than max_age are dropped, and the
+    oldest entries are evicted once the directory exceeds max_bytes.
+    """
+
+    def __init__(
+        self,
+        directory: str = LLM_CACHE_DIR,
+        max_age: float = LLM_CACHE_MAX_AGE,
+        max_bytes: int = LLM_CACHE_MAX_BYTES,
+        enabled: bool = LLM_CACHE_ENABLED,
+    ):
+        self.directory = directory
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(payload: dict, model: str) -> str:
+        material = json.dumps(
+            {
+                "messages": payload.get("messages"),
+                "temperature": payload.get("temperature"),
+                "model": model,
+            },
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, payload: dict, models: list[str]) -> tuple[str, str] | None:
+        """Return (content, model) for the first model with a fresh entry."""
+        if not self.enabled:
+            return None
+        for model in models:
+            path = self._path(self.key(payload, model))
+            try:
+                if time.time() - os.path.getmtime(path) > self.max_age:
+                    os.remove(path)
+                    continue
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except OSError:
+                continue
+            except ValueError:
+                _remove_quietly(path)
+                continue
+            try:
+                content, cached_model = entry["content"], entry["model"]
+            except (KeyError, TypeError):
+                content = cached_model = None
+            if not isinstance(content, str) or not isinstance(cached_model, str):
+                # Malformed entry (not written by put()); drop it
+                _remove_quietly(path)
+                continue
+            with self._lock:
+                self.hits += 1
+            return content, cached_model
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, payload: dict, model: str, content: str) -> None:
+        if not self.enabled:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(self.key(payload, model))
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"model": model, "content": content}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _evict(self) -> None:
+        entries = []
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.max_age:
+                _remove_quietly(path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            _remove_quietly(path)
+            total -= size
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+response_cache = ResponseCache()
+
+
+def _auth_headers() -> dict[str, str]:
+    """Request headers; read at call time, as server.py loads .env after import."""
+    api_key = os.environ.get("LLM_API_KEY", "").strip()
+    if not api_key:
+        raise RuntimeError("未设置环境变量 LLM_API_KEY，请在环境或 .env 中配置")
+    return {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {api_key}",
+    }
+
+
+def _request_completion(payload: dict, model: str, timeout: float, headers: dict[str, str]) -> str:
+    resp = get_client().post(
+        LLM_BASE_URL,
+        headers=headers,
+        json={**payload, "model": model},
+        timeout=timeout,
+    )
+    resp.raise_for_status()
+    content = resp.json()["choices"][0]["message"]["content"]
+    if not isinstance(content, str) or not content.strip():
+        raise ValueError("模型返回内容为空")
+    return content
+
+
+def _record_attempt(stats: ModelStats, on_attempt, model: str, elapsed: float, error=None) -> None:
+    stats.record(model, elapsed, error)
+    if on_attempt is not None:
+        on_attempt(model, elapsed, error)
+
+
+def _start_attempt(attempt, model: str, block: bool) -> bool:
+    """Run attempt(model) on a daemon thread once an attempt slot is free,
+    waiting for one if block is set. Returns False if none was free."""
+    if not _attempt_slots.acquire(blocking=block):
+        return False
+
+    def run() -> None:
+        try:
+            attempt(model)
+        finally:
+            _attempt_slots.release()
+
+    threading.Thread(target=run, daemon=True, name=f"llm-{model}").start()
+    return True
+
+
+def chat_completion(
+    payload: dict,
+    models: list[str] | None = None,
+    hedge_delay: float = LLM_HEDGE_DELAY_FULL,
+    timeout: float = LLM_TIMEOUT,
+    stats: ModelStats | None = None,
+    on_attempt=None,
+) -> tuple[str, str]:
+    """Race the model pool and return (content, model) of the first valid answer.
+
+    The best-scoring model starts first. Each further model is launched once
+    the previous launch has gone hedge_delay seconds without an answer, or
+    immediately when an attempt fails. The first valid response wins; the
+    remaining attempts are abandoned (a blocking request can't be interrupted,
+    so they run out on daemon threads and only feed the statistics). Every
+    attempt holds one of the LLM_MAX_IN_FLIGHT slots until it ends; a hedge
+    that finds none free is retried after the next hedge_delay. Raises the
+    last error if every model fails.
+
+    on_attempt(model, elapsed, error), if given, is called from the attempt's
+    thread as each model attempt finishes; error is None on success.
+    """
+    headers = _auth_headers()
+    stats = stats or model_stats
+    models = stats.ordered(models or LLM_MODEL_POOL)
+    results: queue.Queue = queue.Queue()
+
+    def attempt(model: str) -> None:
+        start = time.monotonic()
+        try:
+            content = _request_completion(payload, model, timeout, headers)
+        except Exception as e:
+            _record_attempt(stats, on_attempt, model, time.monotonic() - start, e)
+            results.put((model, None, e))
+            return
+        _record_attempt(stats, on_attempt, model, time.monotonic() - start)
+        results.put((model, content, None))
+
+    launched = 0
+    in_flight = 0
+    last_error: Exception | None = None
+
+    def launch_next(block: bool) -> None:
+        nonlocal launched, in_flight
+        model = models[launched]
+        if not _start_attempt(attempt, model, block):
+            print("LLM 并发调用已满，暂不启动备用模型")
+            return
+        print(f"正在调用 LLM 生成选题推荐 (模型: {model})...")
+        launched += 1
+        in_flight += 1
+
+    launch_next(block=True)
+    while in_flight:
+        try:
+            model, content, error = results.get(
+                timeout=hedge_delay if launched < len(models) else None,
+            )
+        except queue.Empty:
+            print(f"{hedge_delay:g} 秒内未返回，并行启动备用模型")
+            launch_next(block=False)
+            continue
+        in_flight -= 1
+        if error is None:
+            if in_flight:
+                print(f"模型 {model} 最先返回，放弃其余 {in_flight} 个调用")
+            return content, model
+        print(f"模型 {model} 调用失败: {error}")
+        last_error = error
+        if launched < len(models):
+            launch_next(block=not in_flight)
+
+    raise last_error
+
+
+def _iter_stream_deltas(resp):
+    """Yield content deltas from an OpenAI-style SSE chat-completions stream."""
+    for line in resp.iter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return
+        choices = json.loads(data).get("choices") or []
+        if not choices:
+            continue
+        delta = (choices[0].get("delta") or {}).get("content")
+        if delta:
+            yield delta
+
+
+def stream_chat_completion(
+    payload: dict,
+    on_delta,
+    models: list[str] | None = None,
+    hedge_delay: float = LLM_HEDGE_DELAY,
+    timeout: float = LLM_TIMEOUT,
+    stats: ModelStats | None = None,
+    on_attempt=None,
+) -> tuple[str, str]:
+    """Streaming variant of chat_completion(); returns (content, model).
+
+    Models are hedged the same way, but the race is decided by the first
+    content token: that model wins, on_delta(text) is called from the calling
+    thread for each of its chunks, and every other stream is closed as soon
+    as it notices it lost. A failure before any model has produced a token
+    falls through to the next model; a failure mid-stream is raised, since
+    the partial output has already been handed out.
+    """
+    headers = _auth_headers()
+    stats = stats or model_stats
+    models = stats.ordered(models or LLM_MODEL_POOL)
+    results: queue.Queue = queue.Queue()
+    lock = threading.Lock()
+    winner: str | None = None
+
+    def attempt(model: str) -> None:
+        nonlocal winner
+        start = time.monotonic()
+        try:
+            with get_client().stream(
+                "POST",
+                LLM_BASE_URL,
+                headers=headers,
+                json={**payload, "model": model, "stream": True},
+                timeout=timeout,
+            ) as resp:
+                resp.raise_for_status()
+                for delta in _iter_stream_deltas(resp):
+                    with lock:
+                        if winner is None:
+                            winner = model
+                    if winner != model:
+                        return  # Lost the race; leaving the block closes the stream
+                    results.put((model, "delta", delta))
+            if winner != model:
+                raise ValueError("模型返回内容为空")
+        except Exception as e:
+            _record_attempt(stats, on_attempt, model, time.monotonic() - start, e)
+            results.put((model, "error", e))
+            return
+        _record_attempt(stats, on_attempt, model, time.monotonic() - start)
+        results.put((model, "done", None))
+
+    launched = 0
+    in_flight = 0
+    last_error: Exception | None = None
+    chunks: list[str] = []
+
+    def launch_next(block: bool) -> None:
+        nonlocal launched, in_flight
+        model = models[launched]
+        if not _start_attempt(attempt, model, block):
+            print("LLM 并发调用已满，暂不启动备用模型")
+            return
+        print(f"正在调用 LLM 生成选题推荐 (模型: {model}, 流式)...")
+        launched += 1
+        in_flight += 1
+
+    launch_next(block=True)
+    while in_flight:
+        try:
+            model, kind, value = results.get(
+                timeout=hedge_delay if winner is None and launched < len(models) else None,
+            )
+        except queue.Empty:
+            print(f"{hedge_delay:g} 秒内未返回，并行启动备用模型")
+            launch_next(block=False)
+            continue
+        if kind == "delta":
+            if not chunks and in_flight > 1:
+                print(f"模型 {model} 最先返回，关闭其余 {in_flight - 1} 个调用")
+            chunks.append(value)
+            on_delta(value)
+            continue
+        in_flight -= 1
+        if model == winner:
+            if kind == "error":
+                raise value
+            return "".join(chunks), model
+        if kind == "error" and winner is None:
+            print(f"模型 {model} 调用失败: {value}")
+            last_error = value
+            if launched < len(models):
+                launch_next(block=not in_flight)
+
+    raise last_error
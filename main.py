@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
+import argparse
+import csv
 import json
 import os
-import sys
+import re
+import sqlite3
+import threading
 import time
-
-import httpx
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 
 from scrapers import (
     CLSScraper,
@@ -16,18 +19,41 @@ from scrapers import (
     EastmoneyNewsScraper,
     EastmoneyGubaScraper,
 )
+from scrapers.base import Article, BaseScraper
+from scrapers.snapshot import SnapshotStore, snapshots
+from config import (
+    DEDUP_ENABLED,
+    LLM_BATCH_CONCURRENCY,
+    LLM_MAX_IN_FLIGHT,
+    LLM_STREAM,
+    PROFILES_CSV,
+    SCRAPER_HOST_DELAY,
+    SCRAPER_TIMEOUT,
+    SCRAPER_TIMEOUTS,
+)
+from dedup import dedupe_articles
 from filters import tag_precious_metals
-from formatter import generate_report
-
-# LLM Configuration - hardcoded for deployment
-LLM_BASE_URL = "https://api.ephone.chat/v1/chat/completions"
-LLM_API_KEY = "sk-8BXSZEmvWaM3qanlEMt4eRcDqLjQrh44rWwiNevSfSZ0Sxcl"
-LLM_MODEL_POOL = [
-    "gemini-3-flash-preview",
-    "gemini-3-pro-preview",
-    "gpt-5.2",
-    "glm-4.7"
-]
+from formatter import (
+    append_recommendations,
+    discard_recommendations,
+    finish_recommendations,
+    generate_report,
+    start_recommendations,
+    write_articles_report,
+    write_recommendations,
+)
+from llm import (
+    LLM_MODEL_POOL,
+    chat_completion,
+    model_stats,
+    response_cache,
+    stream_chat_completion,
+)
+from matcher import KeywordAutomaton
+from metrics import RunMetrics
+from prompt import build_topic_prompt, expand_refs
+from relevance import RelevanceIndex
+from storage import ArticleIndex, article_index
 
 # Progress tracking
 PROGRESS_FILE = os.path.join(os.path.dirname(__file__), "output", "progress.json")
@@ -49,114 +75,78 @@ def generate_topics_with_llm(
     articles: list,
     user_profile: str,
     persona_name: str = "",
+    on_topic=None,
+    use_cache: bool = True,
+    relevance: RelevanceIndex | None = None,
+    metrics: RunMetrics | None = None,
 ) -> str:
     """Use LLM to generate personalized topic recommendations for the persona.
 
-    Returns the raw markdown text from the LLM.
-    """
-    # Build headline list with source and URL
-    headline_entries = []
-    title_url_map: dict[str, str] = {}
-    for a in articles:
-        entry = f"- 【{a.source}】{a.title}"
-        if a.url:
-            entry += f"（{a.url}）"
-            title_url_map[a.title] = a.url
-        headline_entries.append(entry)
-
-    headlines = "\n".join(headline_entries)
-
-    prompt = f"""你的任务
-根据以下提供的【新闻素材】和【达人画像】，为该达人生成一份个性化的选题推荐列表。
-
-输入
-
-达人画像
-{user_profile}
-
-今日新闻素材
-{headlines}
-
-推荐逻辑
-
-请按以下步骤思考：
-
-1. 理解达人定位：分析达人的内容风格、核心领域、目标受众和惯用角度。
-2. 筛选相关素材：从所有新闻源中，挑选与达人定位相关的新闻（直接相关或可延伸关联）。
-3. 生成选题：将筛选出的素材转化为适合该达人风格的具体选题，而非简单复述标题。每个选题应体现达人的独特视角和表达方式。
-4. 排序与分类：按相关度和时效性排序。
-
-输出格式
-
-请输出 8-15 个选题建议，每个选题包含：
-
-- 选题标题：一句适合该达人风格的标题（可直接用于视频/文章）
-- 核心角度：用一句话说明这个选题的切入点
-- 素材来源：引用了哪条/哪几条新闻，必须使用 Markdown 超链接格式 [新闻标题](URL)
-- 推荐理由：为什么这个选题适合该达人（1-2句）
-- 热度评级：🔥（高）/ 🔶（中）/ ⚪（低）
-
-注意事项
-- 优先推荐有争议性、有观点空间的话题，而非纯资讯类新闻
-- 可以将多条相关新闻合并为一个更有深度的选题
-- 选题要有"钩子"——能引发观众好奇或共鸣
-- 避免推荐与达人定位完全无关的内容，即使该新闻很热门
-- 如果某条重大新闻与达人领域有间接关联，可以建议一个"跨界解读"角度
-
-请严格按照以下 Markdown 格式输出，注意使用正确的 Markdown 标题层级和换行：
+    With a relevance index over `articles`, only its RELEVANCE_TOP_N
+    articles closest to the profile are considered for the prompt.
 
-## {persona_name} · 今日选题推荐
+    With on_topic set, the completion is streamed and on_topic(section) is
+    called with each linkified markdown section (the heading block, then one
+    per 选题) as soon as it is complete.
 
----
+    The prompt is packed into LLM_PROMPT_TOKEN_BUDGET by prompt.py; the
+    model cites headlines by reference id, expanded back to URLs here.
+    Identical prompts are answered from the response cache unless use_cache
+    is False. Stage timings, including each model attempt, go to metrics
+    when given.
 
-### 选题1：选题标题
-
-- **核心角度**：...
-- **素材来源**：[新闻标题1](URL1)、[新闻标题2](URL2)
-- **推荐理由**：...
-- **热度评级**：🔥/🔶/⚪
-
----
-
-### 选题2：选题标题
-
-- **核心角度**：...
-- **素材来源**：[新闻标题](URL)
-- **推荐理由**：...
-- **热度评级**：🔥/🔶/⚪
-
-...
-
-### 总结排序建议
-
-说明优先产出哪几个选题及原因。"""
+    Returns the raw markdown text from the LLM.
+    """
+    metrics = metrics or RunMetrics("llm", persona_name)
+    with metrics.stage("prompt", persona=persona_name, articles=len(articles)) as record:
+        if relevance is not None:
+            candidates = relevance.top(user_profile)
+            if len(candidates) < len(articles):
+                print(f"相关性预筛: 保留 {len(candidates)}/{len(articles)} 篇")
+            articles = candidates
+        prompt = build_topic_prompt(articles, user_profile, persona_name)
+        record.update(included=prompt.included, tokens=prompt.tokens)
+    print(f"提示词收录 {prompt.included}/{prompt.total} 条新闻，约 {prompt.tokens} tokens")
+
+    def on_attempt(model: str, elapsed: float, error: Exception | None) -> None:
+        fields = {"error": f"{type(error).__name__}: {error}"} if error else {}
+        metrics.add("llm_attempt", model=model, persona=persona_name, wall_time=round(elapsed, 4), **fields)
 
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {LLM_API_KEY}",
-    }
     payload = {
-        "messages": [{"role": "user", "content": prompt}],
+        "messages": [{"role": "user", "content": prompt.text}],
         "temperature": 0.3,
     }
-
-    for i, model in enumerate(LLM_MODEL_POOL):
-        print(f"正在调用 LLM 生成选题推荐 (模型: {model})...")
-        payload["model"] = model
-        try:
-            resp = httpx.post(
-                LLM_BASE_URL,
-                headers=headers,
-                json=payload,
-                timeout=120,
-            )
-            resp.raise_for_status()
-            content = resp.json()["choices"][0]["message"]["content"]
-            break
-        except Exception as e:
-            print(f"模型 {model} 调用失败: {e}")
-            if i == len(LLM_MODEL_POOL) - 1:
-                raise
+    linker = _TitleLinker(prompt.title_urls)
+    splitter = _TopicSplitter()
+
+    def link(text: str) -> str:
+        return linker.linkify(expand_refs(text, prompt.refs))
+
+    def on_delta(delta: str) -> None:
+        for section in splitter.feed(delta):
+            on_topic(link(section))
+
+    with metrics.stage("llm", persona=persona_name, stream=on_topic is not None) as record:
+        cached = response_cache.get(payload, model_stats.ordered(LLM_MODEL_POOL)) if use_cache else None
+        record["cache"] = cached is not None
+        if cached is not None:
+            content, model = cached
+            print(f"命中 LLM 响应缓存 (模型: {model})")
+            if on_topic is not None:
+                on_delta(content)
+        else:
+            if on_topic is None:
+                content, model = chat_completion(payload, on_attempt=on_attempt)
+            else:
+                content, model = stream_chat_completion(payload, on_delta, on_attempt=on_attempt)
+            response_cache.put(payload, model, content)
+        record["model"] = model
+
+    if on_topic is not None:
+        tail = splitter.finish()
+        if tail.strip():
+            on_topic(link(tail))
+    print(f"选题推荐由模型 {model} 生成")
 
     # Strip markdown code fences if present
     content = content.strip()
@@ -166,44 +156,213 @@ def generate_topics_with_llm(
         content = content.rsplit("```", 1)[0]
     content = content.strip()
 
-    # Post-process: replace plain-text title references with markdown links
-    content = _linkify_titles(content, title_url_map)
+    # Post-process: expand cited reference ids, then link plain-text titles
+    content = link(content)
 
     return content
 
 
-def _linkify_titles(text: str, title_url_map: dict[str, str]) -> str:
-    """Replace plain-text news title mentions with markdown hyperlinks.
+class _TopicSplitter:
+    """Cuts a streamed LLM answer into complete markdown sections.
 
-    Skips titles that are already inside a markdown link [...](url).
-    Sorts by title length descending to avoid partial matches.
+    A section ends where the next "### " heading starts, so each 选题 is
+    released whole. A leading code fence is dropped, as in the
+    non-streaming post-processing.
     """
-    import re
-    for title in sorted(title_url_map, key=len, reverse=True):
-        url = title_url_map[title]
-        # Skip if this title is already a markdown link somewhere
-        escaped = re.escape(title)
-        # Match the title only when NOT already inside [...](...)
-        # i.e. not preceded by [ or followed by ](
-        pattern = r"(?<!\[)" + escaped + r"(?!\]\()"
-        replacement = f"[{title}]({url})"
-        text = re.sub(pattern, replacement, text, count=0)
-    return text
 
+    def __init__(self):
+        self._buffer = ""
+        self._started = False
+
+    def feed(self, delta: str) -> list[str]:
+        self._buffer += delta
+        if not self._started:
+            head = self._buffer.lstrip()
+            if not head or (len(head) < 3 and "```".startswith(head)):
+                return []
+            if head.startswith("```"):
+                if "\n" not in head:
+                    return []
+                head = head.split("\n", 1)[1]
+            self._buffer = head
+            self._started = True
+
+        sections = []
+        while True:
+            idx = self._buffer.find("\n### ", 1)
+            if idx == -1:
+                break
+            sections.append(self._buffer[:idx + 1])
+            self._buffer = self._buffer[idx + 1:]
+        return [s for s in sections if s.strip()]
+
+    def finish(self) -> str:
+        rest = self._buffer.rstrip()
+        if rest.endswith("```"):
+            rest = rest[:-3].rstrip()
+        return rest
+
+
+# Markdown links already present in LLM output; titles inside them stay as-is
+_MD_LINK = re.compile(r"\[[^\[\]]*\]\([^()\s]*\)")
+
+
+class _TitleLinker:
+    """Replaces plain-text news title mentions with markdown hyperlinks.
+
+    The title automaton is built once and each text is scanned in a single
+    pass: longest title wins where titles overlap, existing markdown links
+    are skipped, and inserted links are never rescanned.
+    """
 
-def main():
-    # Read user profile and persona name from command line arguments
-    user_profile = ""
-    persona_name = ""
-    if len(sys.argv) > 1:
-        user_profile = sys.argv[1]
-    if len(sys.argv) > 2:
-        persona_name = sys.argv[2]
-
-    all_articles = []
-    all_errors = []
-
-    scrapers = [
+    def __init__(self, title_url_map: dict[str, str]):
+        self.title_url_map = title_url_map
+        self._automaton = KeywordAutomaton(title_url_map)
+
+    def linkify(self, text: str) -> str:
+        if not self._automaton:
+            return text
+        pieces: list[str] = []
+        pos = 0
+        for link in _MD_LINK.finditer(text):
+            pos = self._link_segment(text, pos, link.start(), pieces)
+            pieces.append(text[pos:link.end()])
+            pos = link.end()
+        pos = self._link_segment(text, pos, len(text), pieces)
+        pieces.append(text[pos:])
+        return "".join(pieces)
+
+    def _link_segment(self, text: str, start: int, end: int, pieces: list[str]) -> int:
+        """Append text[start:end] with titles linked, except a trailing
+        unmatched remainder; returns the offset up to which text was consumed."""
+        patterns = self._automaton.patterns
+        pos = start
+        for m_start, m_end, pattern_id in self._automaton.find_longest(text[start:end]):
+            m_start += start
+            m_end += start
+            # Leave bracketed titles alone, like "[title]" or "[title](...)"
+            if (m_start and text[m_start - 1] == "[") or text.startswith("](", m_end):
+                continue
+            title = patterns[pattern_id]
+            pieces.append(text[pos:m_start])
+            pieces.append(f"[{title}]({self.title_url_map[title]})")
+            pos = m_end
+        return pos
+
+
+def _linkify_titles(text: str, title_url_map: dict[str, str]) -> str:
+    """Replace plain-text news title mentions with markdown hyperlinks."""
+    return _TitleLinker(title_url_map).linkify(text)
+
+
+def scrape_all(
+    scrapers: list[BaseScraper],
+    on_scraped=None,
+    force_refresh: bool = False,
+    store: SnapshotStore | None = None,
+) -> tuple[list[Article], list[str]]:
+    """Run all scrapers concurrently and merge their results.
+
+    Each source runs on its own worker thread with its own timeout
+    (SCRAPER_TIMEOUTS, falling back to SCRAPER_TIMEOUT). Scrapers that share a
+    host are serialized with SCRAPER_HOST_DELAY between requests. Articles are
+    merged in scraper order regardless of completion order. A source that
+    times out contributes an error instead of articles.
+
+    Sources with a snapshot younger than their SNAPSHOT_TTLS entry are served
+    from the snapshot store without touching the network, unless
+    force_refresh is set. Successful live fetches refresh the snapshot.
+
+    on_scraped(done_count, scraper, article_count, cache_age) is called from
+    the calling thread as each source finishes; cache_age is the snapshot age
+    in seconds for cache hits and None for live fetches.
+    """
+    store = store or snapshots
+    host_locks = {s.host: threading.Lock() for s in scrapers}
+    host_last: dict[str, float] = {}
+
+    def run(scraper: BaseScraper) -> tuple[list[Article], list[str]]:
+        with host_locks[scraper.host]:
+            last = host_last.get(scraper.host)
+            if last is not None:
+                wait_s = SCRAPER_HOST_DELAY - (time.monotonic() - last)
+                if wait_s > 0:
+                    time.sleep(wait_s)
+            try:
+                articles, errors = scraper.fetch()
+            finally:
+                host_last[scraper.host] = time.monotonic()
+        if not errors:
+            store.put(scraper.source_name, articles)
+        return articles, errors
+
+    results: dict[int, tuple[list[Article], list[str]]] = {}
+
+    def finish(i: int, articles: list[Article], errors: list[str], cache_age: float | None) -> None:
+        scraper = scrapers[i]
+        results[i] = (articles, errors)
+        if cache_age is None:
+            note = ""
+            if scraper.stats.get("not_modified"):
+                note = f" (未变化，节省 {scraper.stats['bytes_saved'] / 1024:.1f} KB)"
+            print(f"[{scraper.source_name}] 获取 {len(articles)} 篇文章{note}")
+        else:
+            print(f"[{scraper.source_name}] 命中缓存 ({cache_age:.0f} 秒前)，{len(articles)} 篇文章")
+        for err in errors:
+            print(f"[{scraper.source_name}] 错误: {err[:200]}")
+        if on_scraped:
+            on_scraped(len(results), scraper, len(articles), cache_age)
+
+    executor = ThreadPoolExecutor(max_workers=max(len(scrapers), 1), thread_name_prefix="scraper")
+    try:
+        now = time.monotonic()
+        pending = {}
+        for i, scraper in enumerate(scrapers):
+            cached = None if force_refresh else store.get(scraper.source_name)
+            if cached is not None:
+                finish(i, cached[0], [], cached[1])
+                continue
+            print(f"[{scraper.source_name}] 正在抓取...")
+            future = executor.submit(run, scraper)
+            timeout = SCRAPER_TIMEOUTS.get(scraper.source_name, SCRAPER_TIMEOUT)
+            pending[future] = (i, now + timeout, timeout)
+
+        while pending:
+            next_deadline = min(deadline for _, deadline, _ in pending.values())
+            done, _ = wait(
+                pending, timeout=max(next_deadline - time.monotonic(), 0),
+                return_when=FIRST_COMPLETED,
+            )
+            now = time.monotonic()
+            finished = []
+            for future, (i, deadline, timeout) in pending.items():
+                if future in done:
+                    articles, errors = future.result()
+                elif deadline <= now:
+                    future.cancel()
+                    articles = []
+                    errors = [f"[{scrapers[i].source_name}] TimeoutError: 抓取超时 (>{timeout}s)"]
+                else:
+                    continue
+                finished.append(future)
+                finish(i, articles, errors, None)
+            for future in finished:
+                del pending[future]
+    finally:
+        # Don't block on sources that timed out; their threads finish on their own
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    all_articles: list[Article] = []
+    all_errors: list[str] = []
+    for i in range(len(scrapers)):
+        articles, errors = results[i]
+        all_articles.extend(articles)
+        all_errors.extend(errors)
+    return all_articles, all_errors
+
+
+def build_scrapers() -> list[BaseScraper]:
+    return [
         CLSScraper(),
         Jin10Scraper(),
         FutuScraper(),
@@ -211,41 +370,200 @@ def main():
         EastmoneyGubaScraper(),
     ]
 
-    # Total steps: scrapers + filter + LLM + report generation
-    total_steps = len(scrapers) + 3
-    current_step = 0
 
-    for i, scraper in enumerate(scrapers):
-        current_step += 1
-        update_progress(current_step, total_steps, f"正在抓取 {scraper.source_name}...")
-        print(f"[{scraper.source_name}] 正在抓取...")
-        articles, errors = scraper.fetch()
-        print(f"[{scraper.source_name}] 获取 {len(articles)} 篇文章")
-        if errors:
-            for err in errors:
-                print(f"[{scraper.source_name}] 错误: {err[:200]}")
-        all_articles.extend(articles)
-        all_errors.extend(errors)
-
-        # Small delay between scrapers
-        if i < len(scrapers) - 1:
-            time.sleep(1.5)
+def collect_articles(
+    scrapers: list[BaseScraper],
+    progress,
+    total_steps: int,
+    force_refresh: bool = False,
+    index: ArticleIndex | None = None,
+    metrics: RunMetrics | None = None,
+) -> tuple[list[Article], list[str]]:
+    """Scrape every source, tag precious-metals articles and merge
+    near-duplicates reported by several sources.
+
+    Articles are checked against the seen-article index: is_new is set, and
+    unchanged articles get their stored tags back instead of being tagged
+    again.
+
+    Reports steps 1..len(scrapers) for the sources and len(scrapers) + 1 for
+    the filter, so callers start their own steps after that. Stage timings
+    go to metrics when given.
+    """
+    metrics = metrics or RunMetrics("collect")
+    current_step = 0
+    cache_hits = 0
+    scrape_start = time.perf_counter()
+
+    def on_scraped(done: int, scraper: BaseScraper, count: int, cache_age: float | None) -> None:
+        nonlocal cache_hits
+        stats = scraper.stats if cache_age is None else {}
+        metrics.add(
+            "scrape",
+            source=scraper.source_name,
+            # Time until the source finished, host-politeness waits included
+            wall_time=round(time.perf_counter() - scrape_start, 4),
+            fetch_time=stats.get("elapsed", 0.0),
+            parse_time=stats.get("parse_time", 0.0),
+            bytes=stats.get("bytes", 0),
+            bytes_saved=stats.get("bytes_saved", 0),
+            retries=stats.get("retries", 0),
+            articles=count,
+            cache=cache_age is not None,
+            not_modified=bool(stats.get("not_modified")),
+        )
+        if cache_age is None:
+            message = f"已完成 {scraper.source_name} ({done}/{len(scrapers)})"
+        else:
+            cache_hits += 1
+            message = f"{scraper.source_name} 命中缓存 ({cache_age:.0f} 秒前) ({done}/{len(scrapers)})"
+        progress(current_step + done, total_steps, message)
+
+    progress(current_step, total_steps, "正在并发抓取所有新闻源...")
+    all_articles, all_errors = scrape_all(scrapers, on_scraped, force_refresh=force_refresh)
+    for record in metrics.stages:
+        if record["stage"] == "scrape" and any(
+            e.startswith(f"[{record['source']}]") for e in all_errors
+        ):
+            record["error"] = True
+    current_step += len(scrapers)
+    if cache_hits:
+        print(f"缓存命中 {cache_hits}/{len(scrapers)} 个新闻源")
+    downloaded = sum(s.stats.get("bytes", 0) for s in scrapers)
+    saved = sum(s.stats.get("bytes_saved", 0) for s in scrapers)
+    print(f"本次下载 {downloaded / 1024:.1f} KB，条件请求节省 {saved / 1024:.1f} KB")
 
     # Apply precious metals filter
     current_step += 1
-    update_progress(current_step, total_steps, "正在筛选贵金属相关文章...")
+    progress(current_step, total_steps, "正在筛选贵金属相关文章...")
     print(f"\n共获取 {len(all_articles)} 篇文章，正在筛选贵金属相关...")
-    tag_precious_metals(all_articles)
+    index = index or article_index
+    with metrics.stage("filter", articles=len(all_articles)) as record:
+        try:
+            untagged = index.mark(all_articles)
+        except sqlite3.Error as e:
+            print(f"文章索引不可用，全部重新标记: {e}")
+            index = None
+            untagged = all_articles
+        tag_precious_metals(untagged)
+        record["tagged"] = len(untagged)
+        if index is not None:
+            try:
+                index.record(all_articles)
+            except sqlite3.Error as e:
+                print(f"文章索引写入失败: {e}")
+    if index is not None:
+        new_count = sum(1 for a in all_articles if a.is_new)
+        print(f"新文章 {new_count} 篇，复用已有标签 {len(all_articles) - len(untagged)} 篇")
     precious_count = sum(1 for a in all_articles if a.is_precious_metals)
     print(f"贵金属相关: {precious_count} 篇")
+    category_counts: dict[str, int] = {}
+    for a in all_articles:
+        for category in a.scores:
+            category_counts[category] = category_counts.get(category, 0) + 1
+    if category_counts:
+        print("关键词分类: " + "，".join(f"{c} {n} 篇" for c, n in category_counts.items()))
+
+    if DEDUP_ENABLED and all_articles:
+        before = len(all_articles)
+        with metrics.stage("dedup", articles=before) as record:
+            all_articles, merged = dedupe_articles(all_articles)
+            record["clusters"] = merged
+        print(f"跨源去重: {before} 篇 → {len(all_articles)} 篇，合并 {merged} 组相似报道")
+
+    return all_articles, all_errors
+
+
+def run_pipeline(
+    user_profile: str = "",
+    persona_name: str = "",
+    progress=update_progress,
+    force_refresh: bool = False,
+    stream: bool = LLM_STREAM,
+    on_topic=None,
+    use_llm_cache: bool = True,
+) -> str:
+    """Scrape all sources, tag, optionally generate recommendations and write
+    the report. Returns the report file path.
+
+    progress(current, total, message) receives step updates; it defaults to
+    update_progress so CLI runs keep feeding progress.json. force_refresh
+    bypasses the article snapshot cache. With stream set, each 选题 is
+    appended to the recommendation file as it arrives and passed to
+    on_topic(section). use_llm_cache=False bypasses the LLM response cache.
+    Stage timings are written to METRICS_DIR.
+    """
+    metrics = RunMetrics("pipeline", persona_name)
+    try:
+        return _run_pipeline(
+            metrics, user_profile, persona_name, progress, force_refresh, stream,
+            on_topic, use_llm_cache,
+        )
+    finally:
+        _save_metrics(metrics)
+
+
+def _save_metrics(metrics: RunMetrics) -> None:
+    try:
+        metrics.save()
+    except OSError as e:
+        print(f"运行指标写入失败: {e}")
+        return
+    print(f"阶段耗时: {metrics.summary()}")
+
+
+def _run_pipeline(
+    metrics: RunMetrics,
+    user_profile: str,
+    persona_name: str,
+    progress,
+    force_refresh: bool,
+    stream: bool,
+    on_topic,
+    use_llm_cache: bool,
+) -> str:
+    scrapers = build_scrapers()
+
+    # Total steps: scrapers + filter + LLM + report generation
+    total_steps = len(scrapers) + 3
+    all_articles, all_errors = collect_articles(
+        scrapers, progress, total_steps, force_refresh, metrics=metrics,
+    )
+    current_step = len(scrapers) + 1
 
     # LLM personalized topic recommendations
     topics_md = ""
+    streamed_path = ""
     if user_profile:
         try:
             current_step += 1
-            update_progress(current_step, total_steps, "正在生成选题推荐...")
-            topics_md = generate_topics_with_llm(all_articles, user_profile, persona_name or "达人")
+            progress(current_step, total_steps, "正在生成选题推荐...")
+            persona_name = persona_name or "达人"
+            on_section = None
+            if stream:
+                # Each 选题 is appended to the persona's report as it arrives;
+                # a failed or empty answer rolls the file back to the previous
+                # report
+                rec_path = start_recommendations(persona_name)
+
+                def append_section(section: str) -> None:
+                    append_recommendations(rec_path, section)
+                    if on_topic:
+                        on_topic(section)
+
+                on_section = append_section
+
+            try:
+                topics_md = generate_topics_with_llm(
+                    all_articles, user_profile, persona_name,
+                    on_topic=on_section, use_cache=use_llm_cache,
+                    relevance=RelevanceIndex(all_articles), metrics=metrics,
+                )
+            finally:
+                if stream and topics_md:
+                    streamed_path = finish_recommendations(rec_path)
+                elif stream:
+                    discard_recommendations(rec_path)
             print(f"LLM 选题推荐已生成")
         except Exception as e:
             print(f"LLM 选题推荐失败: {e}")
@@ -255,13 +573,144 @@ def main():
 
     # Generate report
     current_step += 1
-    update_progress(current_step, total_steps, "正在生成报告...")
-    filepath = generate_report(all_articles, all_errors, topics_md, user_profile, persona_name)
+    progress(current_step, total_steps, "正在生成报告...")
+    with metrics.stage("report", articles=len(all_articles)):
+        filepath = generate_report(
+            all_articles, all_errors, topics_md, user_profile, persona_name, streamed_path,
+        )
     print(f"\n报告已生成: {filepath}")
+    return filepath
+
+
+def read_profiles(path: str = PROFILES_CSV) -> list[dict]:
+    """Read all persona rows (id, name, platform, profile) from profiles.csv."""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def run_batch(
+    profiles: list[dict],
+    progress=update_progress,
+    force_refresh: bool = False,
+    concurrency: int = LLM_BATCH_CONCURRENCY,
+    on_persona=None,
+    use_llm_cache: bool = True,
+) -> list[dict]:
+    """Scrape once, then generate recommendations for every persona in
+    parallel, at most `concurrency` (and LLM_MAX_IN_FLIGHT) personas at a
+    time. Model attempts of all personas together, hedges included, stay
+    within LLM_MAX_IN_FLIGHT.
+
+    Each persona's recommendation file is written as soon as its LLM call
+    completes. on_persona(name, result) is called with the same dict that is
+    returned for that persona: {"name", "success", "filepath" | "error"}.
+    Rows without profile text are skipped. Stage timings are written to
+    METRICS_DIR.
+    """
+    metrics = RunMetrics("batch")
+    try:
+        return _run_batch(
+            metrics, profiles, progress, force_refresh, concurrency, on_persona, use_llm_cache,
+        )
+    finally:
+        _save_metrics(metrics)
+
+
+def _run_batch(
+    metrics: RunMetrics,
+    profiles: list[dict],
+    progress,
+    force_refresh: bool,
+    concurrency: int,
+    on_persona,
+    use_llm_cache: bool,
+) -> list[dict]:
+    profiles = [p for p in profiles if (p.get("profile") or "").strip()]
+    scrapers = build_scrapers()
+
+    # Total steps: scrapers + filter + articles report + one per persona
+    total_steps = len(scrapers) + 2 + len(profiles)
+    all_articles, all_errors = collect_articles(
+        scrapers, progress, total_steps, force_refresh, metrics=metrics,
+    )
+    current_step = len(scrapers) + 1
+
+    current_step += 1
+    progress(current_step, total_steps, "正在生成报告...")
+    with metrics.stage("report", articles=len(all_articles)):
+        write_articles_report(all_articles, all_errors)
+    # Article vectors are shared by every persona
+    relevance = RelevanceIndex(all_articles)
+
+    def generate(profile: dict) -> dict:
+        name = profile.get("name") or profile.get("id") or "达人"
+        topics_md = generate_topics_with_llm(
+            all_articles, profile["profile"], name, use_cache=use_llm_cache,
+            relevance=relevance, metrics=metrics,
+        )
+        return {"name": name, "success": True, "filepath": write_recommendations(topics_md, name)}
+
+    results: list[dict] = []
+    if profiles:
+        progress(current_step, total_steps, f"正在为 {len(profiles)} 位达人生成选题推荐...")
+        workers = max(min(concurrency, LLM_MAX_IN_FLIGHT), 1)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm") as executor:
+            futures = {executor.submit(generate, p): p for p in profiles}
+            for future in as_completed(futures):
+                profile = futures[future]
+                try:
+                    result = future.result()
+                    print(f"[{result['name']}] 选题推荐已生成: {result['filepath']}")
+                except Exception as e:
+                    name = profile.get("name") or profile.get("id") or "达人"
+                    result = {"name": name, "success": False, "error": f"{type(e).__name__}: {e}"}
+                    print(f"[{name}] 选题推荐失败: {e}")
+                results.append(result)
+                current_step += 1
+                status = "完成" if result["success"] else "失败"
+                progress(
+                    current_step, total_steps,
+                    f"{result['name']} 选题推荐{status} ({len(results)}/{len(profiles)})",
+                )
+                if on_persona:
+                    on_persona(result["name"], result)
+    else:
+        print("profiles.csv 中没有可用的达人画像，跳过选题推荐")
+
+    return results
 
-    # Clear progress file
-    if os.path.exists(PROGRESS_FILE):
-        os.remove(PROGRESS_FILE)
+
+def main():
+    parser = argparse.ArgumentParser(description="抓取新闻并生成报告")
+    parser.add_argument("user_profile", nargs="?", default="", help="达人画像")
+    parser.add_argument("persona_name", nargs="?", default="", help="达人名称")
+    parser.add_argument("--refresh", action="store_true", help="忽略文章缓存，强制重新抓取")
+    parser.add_argument("--no-llm-cache", action="store_true", help="不使用 LLM 响应缓存")
+    parser.add_argument("--batch", action="store_true",
+                        help="只抓取一次，为 profiles.csv 中的所有达人生成选题推荐")
+    parser.add_argument("--concurrency", type=int, default=LLM_BATCH_CONCURRENCY,
+                        help="批量模式下同时进行的 LLM 调用数")
+    args = parser.parse_args()
+
+    try:
+        use_llm_cache = not args.no_llm_cache
+        if args.batch:
+            run_batch(
+                read_profiles(), force_refresh=args.refresh, concurrency=args.concurrency,
+                use_llm_cache=use_llm_cache,
+            )
+        else:
+            run_pipeline(
+                args.user_profile, args.persona_name, force_refresh=args.refresh,
+                use_llm_cache=use_llm_cache,
+            )
+        print(f"LLM 响应缓存: {response_cache.stats()}")
+    finally:
+        # Clear progress file
+        if os.path.exists(PROGRESS_FILE):
+            os.remove(PROGRESS_FILE)
 
 
 if __name__ == "__main__":
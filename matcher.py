@@ -0,0 +1,99 @@
+"""Aho–Corasick multi-pattern matcher used for title linking and keyword scans."""
+
+from __future__ import annotations
+
+from collections import deque
+
+
+class KeywordAutomaton:
+    """Finds every occurrence of many patterns in one pass over the text.
+
+    Build once, then call find_all() / find_longest() on as many texts as
+    needed. With ignore_case, patterns and text are compared lowercased;
+    reported offsets always refer to the original text (str.lower() keeps
+    lengths for the CJK and ASCII text this project handles).
+    """
+
+    def __init__(self, patterns, ignore_case: bool = False):
+        self.ignore_case = ignore_case
+        self.patterns: list[str] = []
+        # Node i: transitions, failure link, pattern ids ending here and the
+        # nearest node on the failure chain that has outputs
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[int]] = [[]]
+        self._dict_link: list[int] = [-1]
+
+        seen: set[str] = set()
+        for pattern in patterns:
+            key = pattern.lower() if ignore_case else pattern
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            self._add(key, len(self.patterns))
+            self.patterns.append(pattern)
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def _add(self, key: str, pattern_id: int) -> None:
+        node = 0
+        for ch in key:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._dict_link.append(-1)
+            node = nxt
+        self._out[node].append(pattern_id)
+
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                f = self._fail[child]
+                self._dict_link[child] = f if self._out[f] else self._dict_link[f]
+                queue.append(child)
+
+    def find_all(self, text: str):
+        """Yield (start, end, pattern_id) for every match, overlaps included,
+        in order of end position."""
+        goto, fail, out, dict_link = self._goto, self._fail, self._out, self._dict_link
+        lengths = [len(p) for p in self.patterns]
+        haystack = text.lower() if self.ignore_case else text
+        node = 0
+        for i, ch in enumerate(haystack):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            match = node if out[node] else dict_link[node]
+            while match > 0:
+                for pattern_id in out[match]:
+                    yield i + 1 - lengths[pattern_id], i + 1, pattern_id
+                match = dict_link[match]
+
+    def find_longest(self, text: str) -> list[tuple[int, int, int]]:
+        """Non-overlapping matches, leftmost first and longest at each start."""
+        best: dict[int, tuple[int, int]] = {}
+        for start, end, pattern_id in self.find_all(text):
+            if start not in best or end > best[start][0]:
+                best[start] = (end, pattern_id)
+        matches = []
+        pos = 0
+        for start in sorted(best):
+            if start < pos:
+                continue
+            end, pattern_id = best[start]
+            matches.append((start, end, pattern_id))
+            pos = end
+        return matches
@@ -0,0 +1,160 @@
+"""Per-run stage timings and counters, written as one JSON file per run.
+
+A RunMetrics collects one record per stage (each scraper, the filter,
+every LLM model attempt, the report, ...). Records carry wall_time in
+seconds plus stage-specific fields such as bytes, parse_time, articles or
+retries. aggregate() summarizes recent runs into p50/p95 per stage for
+/api/metrics.
+"""
+
+from __future__ import annotations
+
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import METRICS_DIR, METRICS_HISTORY
+
+# Numeric fields summarized by aggregate()
+_SUMMARIZED = ("wall_time", "bytes", "parse_time", "articles", "retries")
+
+
+class RunMetrics:
+    def __init__(self, kind: str, persona_name: str = ""):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.persona_name = persona_name
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.stages: list[dict] = []
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, **fields) -> dict:
+        """Record an already measured stage. Safe to call from any thread."""
+        record = {"stage": stage, **fields}
+        with self._lock:
+            self.stages.append(record)
+        return record
+
+    @contextmanager
+    def stage(self, stage: str, **fields):
+        """Time the block as one stage. The yielded dict can be filled with
+        more fields; an exception is noted in "error" and re-raised."""
+        record = dict(fields)
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self.add(stage, wall_time=round(time.perf_counter() - start, 4), **record)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            stages = list(self.stages)
+        return {
+            "run_id": self.run_id,
+            "kind": self.kind,
+            "persona_name": self.persona_name,
+            "started_at": self.started_at,
+            "wall_time": round(time.perf_counter() - self._start, 4),
+            "stages": stages,
+        }
+
+    def summary(self) -> str:
+        """One line with the total wall time of each stage name."""
+        totals: dict[str, float] = {}
+        with self._lock:
+            for record in self.stages:
+                if record["stage"] == "llm_attempt":
+                    continue  # Overlaps the llm stage
+                totals[record["stage"]] = totals.get(record["stage"], 0.0) + record.get("wall_time", 0.0)
+        return "，".join(f"{name} {seconds:.2f}s" for name, seconds in totals.items())
+
+    def save(self, directory: str = METRICS_DIR) -> str:
+        """Write the run as JSON and keep only the newest METRICS_HISTORY
+        files. Returns the file path."""
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.fromtimestamp(self.started_at).strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(directory, f"{stamp}_{self.run_id}.json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        for old in _run_files(directory)[:-METRICS_HISTORY]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+        return path
+
+
+def _run_files(directory: str) -> list[str]:
+    # File names start with the timestamp, so name order is run order
+    return sorted(glob.glob(os.path.join(directory, "*.json")))
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of values (q in 0..100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(-(-q * len(ordered) // 100)), 1)
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _stage_key(record: dict) -> str:
+    label = record.get("source") or record.get("model")
+    return f"{record['stage']}:{label}" if label else record["stage"]
+
+
+def aggregate(directory: str = METRICS_DIR, limit: int = METRICS_HISTORY) -> dict:
+    """Summarize the newest `limit` runs: for every stage (scrapers per
+    source, LLM attempts per model) the count, error count and p50/p95 of
+    each numeric field, plus p50/p95 of whole-run wall time per kind."""
+    values: dict[str, dict[str, list[float]]] = {}
+    counts: dict[str, dict[str, int]] = {}
+    run_times: dict[str, list[float]] = {}
+    runs = 0
+    for path in _run_files(directory)[-limit:] if limit > 0 else []:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                run = json.load(f)
+        except (OSError, ValueError):
+            continue
+        runs += 1
+        run_times.setdefault(run.get("kind", ""), []).append(run.get("wall_time", 0.0))
+        for record in run.get("stages", []):
+            key = _stage_key(record)
+            count = counts.setdefault(key, {"count": 0, "errors": 0})
+            count["count"] += 1
+            if record.get("error"):
+                count["errors"] += 1
+            fields = values.setdefault(key, {})
+            for name in _SUMMARIZED:
+                value = record.get(name)
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    fields.setdefault(name, []).append(value)
+
+    stages = {}
+    for key in sorted(counts):
+        stages[key] = dict(counts[key])
+        for name, series in values[key].items():
+            stages[key][name] = {
+                "p50": round(percentile(series, 50), 4),
+                "p95": round(percentile(series, 95), 4),
+            }
+    return {
+        "runs": runs,
+        "wall_time": {
+            kind: {"p50": round(percentile(t, 50), 4), "p95": round(percentile(t, 95), 4)}
+            for kind, t in run_times.items()
+        },
+        "stages": stages,
+    }
@@ -0,0 +1,231 @@
+"""Token-budgeted prompt assembly for topic recommendations.
+
+Articles are ranked by precious-metals tagging, popularity, recency,
+overlap with the persona profile, novelty and how many sources carried
+them, then packed into the prompt until the token budget is spent. Each
+headline gets a short reference id (#12) instead of its URL; the model
+cites the ids and expand_refs() turns them back into links.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from config import LLM_PROMPT_TOKEN_BUDGET, PROMPT_RECENCY_HALF_LIFE, PROMPT_WEIGHTS
+from dedup import shingles
+from scrapers.base import Article
+
+_TEMPLATE = """你的任务
+根据以下提供的【新闻素材】和【达人画像】，为该达人生成一份个性化的选题推荐列表。
+
+输入
+
+达人画像
+{user_profile}
+
+今日新闻素材
+{headlines}
+{new_note}
+推荐逻辑
+
+请按以下步骤思考：
+
+1. 理解达人定位：分析达人的内容风格、核心领域、目标受众和惯用角度。
+2. 筛选相关素材：从所有新闻源中，挑选与达人定位相关的新闻（直接相关或可延伸关联）。
+3. 生成选题：将筛选出的素材转化为适合该达人风格的具体选题，而非简单复述标题。每个选题应体现达人的独特视角和表达方式。
+4. 排序与分类：按相关度和时效性排序。
+
+输出格式
+
+请输出 8-15 个选题建议，每个选题包含：
+
+- 选题标题：一句适合该达人风格的标题（可直接用于视频/文章）
+- 核心角度：用一句话说明这个选题的切入点
+- 素材来源：引用了哪条/哪几条新闻，必须使用 Markdown 超链接格式 [新闻标题](#编号)，编号是素材列表中每条新闻前的 #数字
+- 推荐理由：为什么这个选题适合该达人（1-2句）
+- 热度评级：🔥（高）/ 🔶（中）/ ⚪（低）
+
+注意事项
+- 优先推荐有争议性、有观点空间的话题，而非纯资讯类新闻
+- 可以将多条相关新闻合并为一个更有深度的选题
+- 选题要有"钩子"——能引发观众好奇或共鸣
+- 避免推荐与达人定位完全无关的内容，即使该新闻很热门
+- 如果某条重大新闻与达人领域有间接关联，可以建议一个"跨界解读"角度
+
+请严格按照以下 Markdown 格式输出，注意使用正确的 Markdown 标题层级和换行：
+
+## {persona_name} · 今日选题推荐
+
+---
+
+### 选题1：选题标题
+
+- **核心角度**：...
+- **素材来源**：[新闻标题1](#编号1)、[新闻标题2](#编号2)
+- **推荐理由**：...
+- **热度评级**：🔥/🔶/⚪
+
+---
+
+### 选题2：选题标题
+
+- **核心角度**：...
+- **素材来源**：[新闻标题](#编号)
+- **推荐理由**：...
+- **热度评级**：🔥/🔶/⚪
+
+...
+
+### 总结排序建议
+
+说明优先产出哪几个选题及原因。"""
+
+_NEW_NOTE = (
+    "\n标注 🆕 的是最近新出现的新闻，在相关度相近时请优先选用，避免重复推荐已经报道过的旧闻。\n"
+)
+
+_CJK = re.compile(r"[\u2e80-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef\u3000-\u303f]")
+_TIME_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d")
+# A cited reference: "[title](#12)", or "[#12]" without a title
+_REF_LINK = re.compile(r"\]\(#(\d+)\)")
+_BARE_REF = re.compile(r"\[#(\d+)\](?!\()")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count: about one token per CJK character and one per
+    four other characters, which errs on the high side for common BPE
+    vocabularies."""
+    cjk = len(_CJK.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+@dataclass
+class TopicPrompt:
+    text: str
+    # Reference id -> (title, url) for expand_refs()
+    refs: dict[int, tuple[str, str]] = field(default_factory=dict)
+    # Title -> url of every included headline and its merged copies
+    title_urls: dict[str, str] = field(default_factory=dict)
+    included: int = 0
+    total: int = 0
+    tokens: int = 0
+
+
+def _published_ts(published_at: str) -> float | None:
+    value = published_at.strip()[:19]
+    for fmt in _TIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+def rank_articles(
+    articles: list[Article],
+    user_profile: str,
+    weights: dict[str, float] = PROMPT_WEIGHTS,
+    now: float | None = None,
+) -> list[tuple[float, int]]:
+    """Return (score, index) pairs, best first."""
+    now = time.time() if now is None else now
+    profile = shingles(user_profile)
+    max_hits = max((a.hits for a in articles), default=0)
+    scored = []
+    for i, a in enumerate(articles):
+        ts = _published_ts(a.published_at) if a.published_at else None
+        recency = 0.5 if ts is None else 0.5 ** (max(now - ts, 0) / PROMPT_RECENCY_HALF_LIFE)
+        grams = shingles(f"{a.title}{a.summary}")
+        relevance = len(grams & profile) / len(grams) if grams and profile else 0.0
+        features = {
+            "precious_metals": 1.0 if a.is_precious_metals else 0.0,
+            "hits": math.log1p(a.hits) / math.log1p(max_hits) if max_hits else 0.0,
+            "recency": recency,
+            "relevance": relevance,
+            "new": 1.0 if a.is_new else 0.0,
+            "sources": min(len(a.related), 3) / 3,
+        }
+        score = sum(weights.get(name, 0.0) * value for name, value in features.items())
+        scored.append((score, i))
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return scored
+
+
+def build_topic_prompt(
+    articles: list[Article],
+    user_profile: str,
+    persona_name: str = "",
+    budget: int = LLM_PROMPT_TOKEN_BUDGET,
+) -> TopicPrompt:
+    """Assemble the recommendation prompt within roughly `budget` tokens.
+
+    The highest-ranked headlines are kept while they fit; they are listed
+    in their original (source) order. A budget of 0 keeps every article.
+    """
+    # Flag newly arrived headlines, unless everything is new (first run)
+    flag_new = any(a.is_new for a in articles) and not all(a.is_new for a in articles)
+    new_note = _NEW_NOTE if flag_new else ""
+    fixed = estimate_tokens(
+        _TEMPLATE.format(user_profile=user_profile, headlines="", new_note=new_note,
+                         persona_name=persona_name)
+    )
+
+    entries: dict[int, str] = {}
+    for i, a in enumerate(articles):
+        sources = "/".join(dict.fromkeys([a.source] + [r["source"] for r in a.related]))
+        ref = f"#{i + 1} " if a.url else ""
+        entries[i] = f"- {ref}【{sources}】{'🆕 ' if flag_new and a.is_new else ''}{a.title}"
+
+    if budget:
+        remaining = budget - fixed
+        chosen = []
+        for _, i in rank_articles(articles, user_profile):
+            cost = estimate_tokens(entries[i]) + 1
+            if cost > remaining:
+                continue
+            chosen.append(i)
+            remaining -= cost
+        chosen.sort()
+    else:
+        chosen = list(range(len(articles)))
+
+    prompt = TopicPrompt(text="", included=len(chosen), total=len(articles))
+    for i in chosen:
+        a = articles[i]
+        if a.url:
+            prompt.refs[i + 1] = (a.title, a.url)
+            prompt.title_urls[a.title] = a.url
+        for r in a.related:
+            if r["url"]:
+                prompt.title_urls.setdefault(r["title"], r["url"])
+
+    headlines = "\n".join(entries[i] for i in chosen)
+    prompt.text = _TEMPLATE.format(
+        user_profile=user_profile, headlines=headlines, new_note=new_note,
+        persona_name=persona_name,
+    )
+    prompt.tokens = estimate_tokens(prompt.text)
+    return prompt
+
+
+def expand_refs(text: str, refs: dict[int, tuple[str, str]]) -> str:
+    """Replace cited reference ids with URLs: "[title](#12)" gets the URL
+    as its target and "[#12]" becomes "[title](url)". Unknown ids are left
+    untouched."""
+    if not refs:
+        return text
+
+    def link_target(m: re.Match) -> str:
+        ref = refs.get(int(m.group(1)))
+        return f"]({ref[1]})" if ref else m.group(0)
+
+    def bare(m: re.Match) -> str:
+        ref = refs.get(int(m.group(1)))
+        return f"[{ref[0]}]({ref[1]})" if ref else m.group(0)
+
+    text = _REF_LINK.sub(link_target, text)
+    return _BARE_REF.sub(bare, text)
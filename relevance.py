@@ -0,0 +1,72 @@
+"""Offline persona-to-article relevance with character n-gram TF-IDF.
+
+Article vectors are computed once per scrape; each persona profile is then
+scored against them with a sparse cosine similarity through an inverted
+index, so only the articles sharing n-grams with the profile are touched.
+Vectors are plain dicts; no NumPy or model download is needed.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import Counter, defaultdict
+
+from config import RELEVANCE_NGRAMS, RELEVANCE_TOP_N
+from dedup import normalize_title
+from scrapers.base import Article
+
+
+def char_ngrams(text: str, sizes=RELEVANCE_NGRAMS) -> Counter:
+    text = normalize_title(text)
+    grams: Counter = Counter()
+    for n in sizes:
+        grams.update(text[i:i + n] for i in range(len(text) - n + 1))
+    return grams
+
+
+class RelevanceIndex:
+    """TF-IDF vectors (sublinear tf, smoothed idf, L2-normalized) over the
+    title and summary of each article."""
+
+    def __init__(self, articles: list[Article], sizes=RELEVANCE_NGRAMS):
+        self.articles = articles
+        self.sizes = sizes
+        counts = [char_ngrams(f"{a.title} {a.summary}", sizes) for a in articles]
+        df: Counter = Counter()
+        for c in counts:
+            df.update(c.keys())
+        n = len(articles)
+        self.idf = {term: math.log((1 + n) / (1 + d)) + 1 for term, d in df.items()}
+
+        # term -> [(article index, weight)]
+        self._postings: dict[str, list[tuple[int, float]]] = defaultdict(list)
+        for i, c in enumerate(counts):
+            vector = self._weigh(c)
+            for term, weight in vector.items():
+                self._postings[term].append((i, weight))
+
+    def _weigh(self, counts: Counter) -> dict[str, float]:
+        vector = {
+            term: (1 + math.log(count)) * self.idf[term]
+            for term, count in counts.items()
+            if term in self.idf
+        }
+        norm = math.sqrt(sum(w * w for w in vector.values()))
+        return {term: w / norm for term, w in vector.items()} if norm else {}
+
+    def scores(self, profile: str) -> list[float]:
+        """Cosine similarity of every article to the profile text."""
+        result = [0.0] * len(self.articles)
+        for term, weight in self._weigh(char_ngrams(profile, self.sizes)).items():
+            for i, article_weight in self._postings[term]:
+                result[i] += weight * article_weight
+        return result
+
+    def top(self, profile: str, n: int = RELEVANCE_TOP_N) -> list[Article]:
+        """The n articles most relevant to the profile, in their original
+        order. n <= 0, or n covering every article, keeps all of them."""
+        if n <= 0 or n >= len(self.articles):
+            return list(self.articles)
+        scores = self.scores(profile)
+        best = sorted(range(len(scores)), key=lambda i: (-scores[i], i))[:n]
+        return [self.articles[i] for i in sorted(best)]
@@ -2,9 +2,19 @@
 
 from __future__ import annotations
 
+import time
 import traceback
-from dataclasses import dataclass, field
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
+from urllib.parse import urlparse
+
+import httpx
+
+from config import CONDITIONAL_GET
+from scrapers.client import get_client
+from scrapers.validators import ValidatorStore, validators as default_validators
 
 
 @dataclass
@@ -18,23 +28,159 @@ class Article:
     hits: int = 0
     tags: list[str] = field(default_factory=list)
     is_precious_metals: bool = False
+    is_new: bool = False
+    # Weighted keyword score per category, see filters.KeywordScorer
+    scores: dict[str, float] = field(default_factory=dict)
+    # Near-duplicate copies from other sources: {"source", "title", "url"}
+    related: list[dict] = field(default_factory=list)
+
+
+class NotModified(Exception):
+    """Raised by BaseScraper._request on 304; carries the cached articles."""
+
+    def __init__(self, articles: list[Article]):
+        super().__init__("not modified")
+        self.articles = articles
 
 
 class BaseScraper:
-    """Base class that wraps fetch() in error handling."""
+    """Base class that wraps fetch() in error handling.
+
+    Subclasses should issue their primary request through self._request(),
+    or self._stream() to read the body incrementally, so it is sent
+    conditionally: a 304 ends the fetch with the articles parsed from the
+    previous full response. self.stats records, for the last fetch, bytes
+    downloaded and saved, wall time, time spent waiting on requests, the
+    remaining parse time, and fallback retries (counted by subclasses).
+    """
 
     source_name: str = ""
+    url: str = ""
+
+    def __init__(
+        self,
+        client: httpx.Client | None = None,
+        validators: ValidatorStore | None = None,
+    ):
+        self._client = client
+        self._validators = validators or default_validators
+        self._pending_validator: tuple | None = None
+        self.stats: dict = {}
+
+    @property
+    def client(self) -> httpx.Client:
+        """Injected client, or the shared pooled client by default."""
+        return self._client or get_client()
+
+    @property
+    def host(self) -> str:
+        """Host this scraper talks to, used for per-host politeness."""
+        return urlparse(self.url).netloc
 
     def fetch(self) -> tuple[list[Article], list[str]]:
         """Return (articles, errors). Catches all exceptions so one source
         failing doesn't crash others."""
+        self.stats = {
+            "bytes": 0,
+            "bytes_saved": 0,
+            "not_modified": False,
+            "elapsed": 0.0,
+            "request_time": 0.0,
+            "parse_time": 0.0,
+            "retries": 0,
+        }
+        self._pending_validator = None
+        start = time.perf_counter()
         try:
             articles = self._do_fetch()
+            # An empty list is more likely a parse failure than an empty
+            # feed; don't let a 304 replay it until the page changes
+            if self._pending_validator and articles:
+                key, etag, last_modified, size = self._pending_validator
+                self._validators.put(
+                    key, etag, last_modified, size, [asdict(a) for a in articles],
+                )
             return articles, []
+        except NotModified as e:
+            return e.articles, []
         except Exception as e:
             tb = traceback.format_exc()
             error_msg = f"[{self.source_name}] {type(e).__name__}: {e}\n{tb}"
             return [], [error_msg]
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stats["elapsed"] = round(elapsed, 4)
+            self.stats["parse_time"] = round(max(elapsed - self.stats["request_time"], 0.0), 4)
 
     def _do_fetch(self) -> list[Article]:
         raise NotImplementedError
+
+    def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request with If-None-Match / If-Modified-Since from the last
+        full response to this URL. Raises NotModified on 304. Only GET/HEAD
+        are made conditional; other methods would answer 412 instead."""
+        key, entry = self._add_validators(method, url, kwargs)
+        start = time.perf_counter()
+        resp = self.client.request(method, url, **kwargs)
+        self.stats["request_time"] += time.perf_counter() - start
+        size = _response_size(resp)
+        self.stats["bytes"] += size
+        self._check_not_modified(resp, entry)
+        self._remember_validators(key, resp, size)
+        return resp
+
+    @contextmanager
+    def _stream(self, method: str, url: str, **kwargs) -> Iterator[httpx.Response]:
+        """Like _request, but yields the response with its body unread so the
+        caller can stop reading early. bytes counts what was actually read;
+        request_time only covers the response headers."""
+        key, entry = self._add_validators(method, url, kwargs)
+        start = time.perf_counter()
+        with self.client.stream(method, url, **kwargs) as resp:
+            self.stats["request_time"] += time.perf_counter() - start
+            try:
+                self._check_not_modified(resp, entry)
+                yield resp
+            finally:
+                self.stats["bytes"] += resp.num_bytes_downloaded
+            self._remember_validators(key, resp, resp.num_bytes_downloaded)
+
+    def _add_validators(self, method: str, url: str, kwargs: dict) -> tuple[str | None, dict | None]:
+        """Add the stored validators for this request to kwargs["headers"].
+        Returns (validator key, stored entry); the key is None when the
+        request is not sent conditionally."""
+        if not CONDITIONAL_GET or method not in ("GET", "HEAD"):
+            return None, None
+        key = f"{method} {httpx.URL(url, params=kwargs.get('params'))}"
+        entry = self._validators.get(key)
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        kwargs["headers"] = headers
+        return key, entry
+
+    def _check_not_modified(self, resp: httpx.Response, entry: dict | None) -> None:
+        if resp.status_code == 304 and entry:
+            self.stats["not_modified"] = True
+            self.stats["bytes_saved"] += entry["size"]
+            raise NotModified([Article(**a) for a in entry["articles"]])
+
+    def _remember_validators(self, key: str | None, resp: httpx.Response, size: int) -> None:
+        """Keep the response's validators; fetch() stores them with the
+        parsed articles once parsing succeeds."""
+        if key is None:
+            return
+        self._pending_validator = (
+            key,
+            resp.headers.get("ETag", ""),
+            resp.headers.get("Last-Modified", ""),
+            size,
+        )
+
+
+def _response_size(resp: httpx.Response) -> int:
+    """Bytes received on the wire, or the body size for pre-read responses."""
+    return resp.num_bytes_downloaded or len(resp.content)
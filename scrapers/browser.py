@@ -0,0 +1,125 @@
+"""Warm headless-browser pool for scrapers that need a real page.
+
+Playwright's sync API is bound to the thread that started it, while
+scrapers run on arbitrary worker threads. The pool therefore owns one
+dedicated browser thread: callers hand it a function, which runs there
+against a fresh page in a long-lived browser context. The browser is
+launched on first use, relaunched if it disconnects, and closed at exit.
+"""
+
+from __future__ import annotations
+
+import atexit
+import queue
+import threading
+from concurrent.futures import Future
+
+from config import PLAYWRIGHT_BLOCKED_RESOURCES, PLAYWRIGHT_TASK_TIMEOUT
+
+
+class BrowserPool:
+    def __init__(
+        self,
+        blocked_resources=PLAYWRIGHT_BLOCKED_RESOURCES,
+        task_timeout: float = PLAYWRIGHT_TASK_TIMEOUT,
+    ):
+        self.blocked_resources = frozenset(blocked_resources)
+        self.task_timeout = task_timeout
+        self._tasks: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def run(self, fn, timeout: float | None = None):
+        """Run fn(page) on the browser thread and return its result.
+        The page is always closed afterwards; exceptions propagate."""
+        # Fail fast in the caller when Playwright isn't installed
+        import playwright.sync_api  # noqa: F401
+
+        future: Future = Future()
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._worker, daemon=True, name="browser")
+                self._thread.start()
+            self._tasks.put((fn, future))
+        return future.result(timeout=self.task_timeout if timeout is None else timeout)
+
+    def close(self, timeout: float = 10) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            self._tasks.put(None)
+            thread.join(timeout)
+
+    def _block(self, route) -> None:
+        if route.request.resource_type in self.blocked_resources:
+            route.abort()
+        else:
+            route.continue_()
+
+    def _worker(self) -> None:
+        from playwright.sync_api import sync_playwright
+
+        playwright = browser = context = None
+        try:
+            while True:
+                task = self._tasks.get()
+                if task is None:
+                    break
+                fn, future = task
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    if playwright is None:
+                        playwright = sync_playwright().start()
+                    if browser is None or not browser.is_connected():
+                        browser = playwright.chromium.launch(headless=True)
+                        context = browser.new_context()
+                        if self.blocked_resources:
+                            context.route("**/*", self._block)
+                    page = context.new_page()
+                    try:
+                        result = fn(page)
+                    finally:
+                        _close_quietly(page)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+        finally:
+            for resource in (context, browser):
+                if resource is not None:
+                    _close_quietly(resource)
+            if playwright is not None:
+                try:
+                    playwright.stop()
+                except Exception:
+                    pass
+
+
+def _close_quietly(resource) -> None:
+    try:
+        resource.close()
+    except Exception:
+        pass
+
+
+_pool: BrowserPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Return the process-wide browser pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = BrowserPool()
+    return _pool
+
+
+def _close_pool() -> None:
+    if _pool is not None:
+        _pool.close()
+
+
+atexit.register(_close_pool)
@@ -0,0 +1,72 @@
+"""Shared pooled HTTP client used by all scrapers and the LLM call."""
+
+from __future__ import annotations
+
+import atexit
+import threading
+
+import httpx
+
+from config import (
+    HTTP_DEFAULT_HEADERS,
+    HTTP_HTTP2,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_TIMEOUT,
+)
+
+_client: httpx.Client | None = None
+_lock = threading.Lock()
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_client(**kwargs) -> httpx.Client:
+    """Build a client with the configured pool limits, keep-alive and headers.
+    Keyword arguments override the defaults (e.g. transport= for tests)."""
+    options = {
+        "headers": HTTP_DEFAULT_HEADERS,
+        "http2": HTTP_HTTP2 and _http2_available(),
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": HTTP_TIMEOUT,
+    }
+    options.update(kwargs)
+    return httpx.Client(**options)
+
+
+def get_client() -> httpx.Client:
+    """Return the process-wide client, creating it on first use.
+    The client is thread-safe, so concurrent scrapers share its pool."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = create_client()
+    return _client
+
+
+def set_client(client: httpx.Client | None) -> None:
+    """Replace the process-wide client, closing the previous one."""
+    global _client
+    with _lock:
+        old, _client = _client, client
+    if old is not None and old is not client:
+        old.close()
+
+
+def close_client() -> None:
+    set_client(None)
+
+
+atexit.register(close_client)
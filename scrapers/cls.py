@@ -4,17 +4,17 @@ from __future__ import annotations
 
 from datetime import datetime
 
-import httpx
-
 from config import CLS_API_URL, CLS_API_PARAMS, CLS_HEADERS
 from scrapers.base import Article, BaseScraper
 
 
 class CLSScraper(BaseScraper):
     source_name = "财联社"
+    url = CLS_API_URL
 
     def _do_fetch(self) -> list[Article]:
-        resp = httpx.get(
+        resp = self._request(
+            "GET",
             CLS_API_URL,
             params=CLS_API_PARAMS,
             headers=CLS_HEADERS,
@@ -2,17 +2,17 @@
 
 from __future__ import annotations
 
-import httpx
-
 from config import EASTMONEY_GUBA_API_URL, EASTMONEY_GUBA_HEADERS
 from scrapers.base import Article, BaseScraper
 
 
 class EastmoneyGubaScraper(BaseScraper):
     source_name = "东方财富股吧"
+    url = EASTMONEY_GUBA_API_URL
 
     def _do_fetch(self) -> list[Article]:
-        resp = httpx.post(
+        resp = self._request(
+            "POST",
             EASTMONEY_GUBA_API_URL,
             data={"path": "newtopic/api/Topic/HomePageListRead"},
             headers=EASTMONEY_GUBA_HEADERS,
@@ -5,8 +5,6 @@ from __future__ import annotations
 import json
 import re
 
-import httpx
-
 from config import (
     EASTMONEY_NEWS_API_URL,
     EASTMONEY_NEWS_PARAMS,
@@ -17,9 +15,11 @@ from scrapers.base import Article, BaseScraper
 
 class EastmoneyNewsScraper(BaseScraper):
     source_name = "东方财富"
+    url = EASTMONEY_NEWS_API_URL
 
     def _do_fetch(self) -> list[Article]:
-        resp = httpx.get(
+        resp = self._request(
+            "GET",
             EASTMONEY_NEWS_API_URL,
             params=EASTMONEY_NEWS_PARAMS,
             headers=EASTMONEY_NEWS_HEADERS,
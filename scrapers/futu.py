@@ -1,40 +1,45 @@
-"""Futu (富途) scraper — via TopHub SSR page."""
+"""Futu (富途) scraper — via TopHub SSR page.
+
+The hot list table is read with a C-based parser when one is installed
+(selectolax's lexbor backend, then lxml), falling back to BeautifulSoup's
+html.parser. Every backend yields the same rows.
+"""
 
 from __future__ import annotations
 
-import httpx
 from bs4 import BeautifulSoup
 
-from config import FUTU_URL, FUTU_HEADERS
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # optional fast path
+    LexborHTMLParser = None
+
+try:
+    from lxml import html as lxml_html
+except ImportError:  # optional fast path
+    lxml_html = None
+
+from config import FUTU_URL, FUTU_HEADERS, FUTU_HTML_PARSER
 from scrapers.base import Article, BaseScraper
 
+# XPath equivalent of the CSS class selector, as BeautifulSoup's class_ matches
+_XPATH_CLASS = "contains(concat(' ', normalize-space(@class), ' '), ' {} ')"
+
 
 class FutuScraper(BaseScraper):
     source_name = "富途"
+    url = FUTU_URL
 
     def _do_fetch(self) -> list[Article]:
-        resp = httpx.get(FUTU_URL, headers=FUTU_HEADERS, timeout=15, follow_redirects=True)
+        resp = self._request("GET", FUTU_URL, headers=FUTU_HEADERS, timeout=15, follow_redirects=True)
         resp.raise_for_status()
+        return self._parse(resp.text)
 
-        soup = BeautifulSoup(resp.text, "html.parser")
-        table = soup.find("table", class_="table")
-        if not table:
-            return []
-
+    def _parse(self, html: str, backend: str = FUTU_HTML_PARSER) -> list[Article]:
         articles: list[Article] = []
         seen_titles: set[str] = set()
 
-        for row in table.find_all("tr"):
-            tds = row.find_all("td")
-            if len(tds) < 3:
-                continue
-
-            content_td = tds[2]
-            link = content_td.find("a")
-            if not link:
-                continue
-
-            title = link.get_text(strip=True)
+        for title, url, author in _ROW_PARSERS[resolve_backend(backend)](html):
             if not title or len(title) < 4:
                 continue
 
@@ -42,14 +47,6 @@ class FutuScraper(BaseScraper):
                 continue
             seen_titles.add(title)
 
-            url = link.get("href", "")
-
-            # Source is in .item-desc div
-            author = ""
-            desc_div = content_td.find("div", class_="item-desc")
-            if desc_div:
-                author = desc_div.get_text(strip=True)
-
             articles.append(
                 Article(
                     source=self.source_name,
@@ -60,3 +57,99 @@ class FutuScraper(BaseScraper):
             )
 
         return articles
+
+
+def available_backends() -> list[str]:
+    """Installed HTML parser backends, fastest first."""
+    names = []
+    if LexborHTMLParser is not None:
+        names.append("selectolax")
+    if lxml_html is not None:
+        names.append("lxml")
+    names.append("bs4")
+    return names
+
+
+def resolve_backend(name: str = FUTU_HTML_PARSER) -> str:
+    """The requested backend if installed, else the fastest available."""
+    backends = available_backends()
+    return name if name in backends else backends[0]
+
+
+# Each row parser yields (title, url, author) for every table row with at
+# least three cells and a link in the third; text is stripped per text node
+# and joined, like BeautifulSoup's get_text(strip=True).
+
+def _rows_selectolax(html: str):
+    table = LexborHTMLParser(html).css_first("table.table")
+    if table is None:
+        return
+    for row in table.css("tr"):
+        tds = row.css("td")
+        if len(tds) < 3:
+            continue
+        link = tds[2].css_first("a")
+        if link is None:
+            continue
+        desc_div = tds[2].css_first("div.item-desc")
+        yield (
+            link.text(deep=True, separator="", strip=True),
+            link.attributes.get("href") or "",
+            desc_div.text(deep=True, separator="", strip=True) if desc_div is not None else "",
+        )
+
+
+def _rows_lxml(html: str):
+    if not html.strip():
+        return
+    tables = lxml_html.document_fromstring(html).xpath(f"//table[{_XPATH_CLASS.format('table')}]")
+    if not tables:
+        return
+    for row in tables[0].iter("tr"):
+        tds = list(row.iter("td"))
+        if len(tds) < 3:
+            continue
+        link = next(tds[2].iter("a"), None)
+        if link is None:
+            continue
+        desc_divs = tds[2].xpath(f".//div[{_XPATH_CLASS.format('item-desc')}]")
+        yield (
+            _lxml_text(link),
+            link.get("href") or "",
+            _lxml_text(desc_divs[0]) if desc_divs else "",
+        )
+
+
+def _lxml_text(element) -> str:
+    return "".join(text.strip() for text in element.xpath(".//text()"))
+
+
+def _rows_bs4(html: str):
+    soup = BeautifulSoup(html, "html.parser")
+    table = soup.find("table", class_="table")
+    if not table:
+        return
+    for row in table.find_all("tr"):
+        tds = row.find_all("td")
+        if len(tds) < 3:
+            continue
+
+        content_td = tds[2]
+        link = content_td.find("a")
+        if not link:
+            continue
+
+        # Source is in .item-desc div
+        author = ""
+        desc_div = content_td.find("div", class_="item-desc")
+        if desc_div:
+            author = desc_div.get_text(strip=True)
+
+        yield link.get_text(strip=True), link.get("href", ""), author
+
+
+_ROW_PARSERS = {
+    "selectolax": _rows_selectolax,
+    "lxml": _rows_lxml,
+    "bs4": _rows_bs4,
+}
@@ -2,64 +2,65 @@
 
 from __future__ import annotations
 
-import json
-import re
-import subprocess
-import tempfile
-
 import httpx
 
-from config import JIN10_URL, JIN10_HEADERS
+from config import JIN10_URL, JIN10_HEADERS, PLAYWRIGHT_NUXT_TIMEOUT
 from scrapers.base import Article, BaseScraper
+from scrapers.browser import get_browser_pool
+from scrapers.nuxt import NodeEvalError, get_evaluator, read_nuxt_script
+
+# Wraps the NUXT IIFE so node only serializes what _extract_articles reads:
+# data / payload, and the first state store holding a "list"
+_NUXT_PROJECTION = """(function (n) {
+  if (!n || typeof n !== 'object') return n;
+  var state = {};
+  for (var key in (n.state || {})) {
+    var v = n.state[key];
+    if (v && typeof v === 'object' && !Array.isArray(v) && 'list' in v) {
+      state[key] = v;
+      break;
+    }
+  }
+  return {data: n.data, payload: n.payload, state: state};
+})(%s
+)"""
 
 
 class Jin10Scraper(BaseScraper):
     source_name = "金十"
+    url = JIN10_URL
 
     def _do_fetch(self) -> list[Article]:
         articles = self._try_http()
         if articles is not None:
             return articles
+        # The HTTP response was unusable; its validators must not be stored
+        # with what the browser finds, or a 304 would replay that
+        self._pending_validator = None
+        self.stats["retries"] += 1
         return self._try_playwright()
 
     def _try_http(self) -> list[Article] | None:
-        """Fetch HTML, extract NUXT IIFE, evaluate with Node.js."""
+        """Stream the HTML until the NUXT IIFE has arrived, then evaluate it
+        with Node.js."""
         try:
-            resp = httpx.get(
-                JIN10_URL, headers=JIN10_HEADERS, timeout=20, follow_redirects=True,
-            )
-            resp.raise_for_status()
+            with self._stream(
+                "GET", JIN10_URL, headers=JIN10_HEADERS, timeout=20, follow_redirects=True,
+            ) as resp:
+                resp.raise_for_status()
+                raw_js = read_nuxt_script(resp.iter_text())
         except (httpx.ConnectTimeout, httpx.ReadTimeout, httpx.ConnectError, httpx.HTTPStatusError):
             return None
-        html = resp.text
-
-        match = re.search(r"window\.__NUXT__\s*=\s*(.+?);\s*</script>", html, re.DOTALL)
-        if not match:
+        if not raw_js:
             return None
 
-        raw_js = match.group(1)
-
         # The NUXT payload is an IIFE that chompjs can't parse.
-        # Use Node.js to evaluate it safely.
-        js_code = (
-            "try { console.log(JSON.stringify(" + raw_js + ")); }"
-            " catch(e) { process.exit(1); }"
-        )
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".js", delete=False) as f:
-            f.write(js_code)
-            tmp_path = f.name
-
+        # Evaluate it in the resident, sandboxed Node.js worker.
         try:
-            result = subprocess.run(
-                ["node", tmp_path],
-                capture_output=True,
-                text=True,
-                timeout=10,
-            )
-            if result.returncode != 0:
-                return None
-            nuxt_data = json.loads(result.stdout)
-        except (subprocess.TimeoutExpired, json.JSONDecodeError):
+            nuxt_data = get_evaluator().evaluate(_NUXT_PROJECTION % raw_js)
+        except NodeEvalError:
+            return None
+        if not isinstance(nuxt_data, dict):
             return None
 
         return self._extract_articles(nuxt_data)
@@ -123,33 +124,37 @@ class Jin10Scraper(BaseScraper):
 
     def _try_playwright(self) -> list[Article]:
         """Fallback: use Playwright to evaluate window.__NUXT__ in browser."""
-        from playwright.sync_api import sync_playwright
-
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            page.goto(JIN10_URL, wait_until="domcontentloaded", timeout=30000)
-            page.wait_for_timeout(3000)
-
-            nuxt_data = page.evaluate(
-                """() => {
-                    try {
-                        return JSON.parse(JSON.stringify(window.__NUXT__));
-                    } catch(e) {
-                        return null;
-                    }
-                }"""
+        return get_browser_pool().run(self._scrape_page)
+
+    def _scrape_page(self, page) -> list[Article]:
+        """Runs on the browser pool's thread with a fresh page."""
+        from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+        page.goto(JIN10_URL, wait_until="domcontentloaded", timeout=30000)
+        try:
+            page.wait_for_function(
+                "() => window.__NUXT__ !== undefined",
+                timeout=PLAYWRIGHT_NUXT_TIMEOUT,
             )
+        except PlaywrightTimeoutError:
+            return self._parse_dom(page)
+
+        nuxt_data = page.evaluate(
+            """() => {
+                try {
+                    return JSON.parse(JSON.stringify(window.__NUXT__));
+                } catch(e) {
+                    return null;
+                }
+            }"""
+        )
 
-            if nuxt_data:
-                articles = self._extract_articles(nuxt_data)
-                if articles:
-                    browser.close()
-                    return articles
+        if nuxt_data:
+            articles = self._extract_articles(nuxt_data)
+            if articles:
+                return articles
 
-            articles = self._parse_dom(page)
-            browser.close()
-            return articles
+        return self._parse_dom(page)
 
     def _parse_dom(self, page) -> list[Article]:
         """Parse articles from rendered DOM as last resort."""
@@ -0,0 +1,212 @@
+"""Resident Node.js evaluator for NUXT payload IIFEs.
+
+One long-lived `node` process is reused across fetches. It reads one JSON
+request per line on stdin, evaluates the expression in an empty vm context
+(no require/process) with a timeout, and writes one JSON response per line.
+read_nuxt_script() finds the payload in a page while it is downloading.
+"""
+
+from __future__ import annotations
+
+import atexit
+import itertools
+import json
+import queue
+import subprocess
+import threading
+from collections.abc import Iterable
+
+from config import NODE_EVAL_TIMEOUT
+
+_WORKER_JS = r"""
+const vm = require('vm');
+const readline = require('readline');
+const rl = readline.createInterface({ input: process.stdin, terminal: false });
+rl.on('line', (line) => {
+  let req;
+  try { req = JSON.parse(line); } catch (e) { return; }
+  let resp;
+  try {
+    const value = vm.runInNewContext('(' + req.code + '\n)', Object.create(null), {
+      timeout: req.timeout_ms,
+    });
+    resp = { id: req.id, ok: true, value: value === undefined ? null : value };
+  } catch (e) {
+    resp = { id: req.id, ok: false, error: String((e && e.message) || e) };
+  }
+  process.stdout.write(JSON.stringify(resp) + '\n');
+});
+"""
+
+
+class NodeEvalError(RuntimeError):
+    """The expression failed, timed out, or the worker died."""
+
+
+class NodeEvaluator:
+    """Evaluates JS expressions in a resident node worker.
+
+    Requests are serialized; a crashed or hung worker is killed and started
+    again on the next call.
+    """
+
+    def __init__(self, node: str = "node", timeout: float = NODE_EVAL_TIMEOUT):
+        self.node = node
+        self.timeout = timeout
+        self._proc: subprocess.Popen | None = None
+        self._lines: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+
+    def evaluate(self, code: str, timeout: float | None = None):
+        """Evaluate a JS expression and return its JSON-decoded value."""
+        timeout = self.timeout if timeout is None else timeout
+        with self._lock:
+            proc = self._ensure_started()
+            request_id = next(self._ids)
+            request = {"id": request_id, "code": code, "timeout_ms": int(timeout * 1000)}
+            try:
+                proc.stdin.write(json.dumps(request) + "\n")
+                proc.stdin.flush()
+            except OSError as e:
+                self._stop()
+                raise NodeEvalError(f"node worker unavailable: {e}") from e
+
+            while True:
+                try:
+                    # vm enforces the timeout for the script itself; the margin
+                    # covers (de)serialization of large payloads
+                    line = self._lines.get(timeout=timeout + 5)
+                except queue.Empty:
+                    self._stop()
+                    raise NodeEvalError("node worker timed out") from None
+                if line is None:
+                    self._stop()
+                    raise NodeEvalError("node worker exited")
+                response = json.loads(line)
+                if response.get("id") == request_id:
+                    break
+
+        if not response["ok"]:
+            raise NodeEvalError(response.get("error") or "evaluation failed")
+        return response["value"]
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop()
+
+    def _ensure_started(self) -> subprocess.Popen:
+        if self._proc is not None and self._proc.poll() is None:
+            return self._proc
+        self._stop()
+        try:
+            proc = subprocess.Popen(
+                [self.node, "-e", _WORKER_JS],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                encoding="utf-8",
+                bufsize=1,
+            )
+        except OSError as e:
+            raise NodeEvalError(f"cannot start node: {e}") from e
+        lines: queue.Queue = queue.Queue()
+        threading.Thread(target=_pump, args=(proc.stdout, lines), daemon=True).start()
+        self._proc = proc
+        self._lines = lines
+        return proc
+
+    def _stop(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+        for stream in (proc.stdin, proc.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+
+def _pump(stream, lines: queue.Queue) -> None:
+    """Forward worker stdout lines to the queue; None marks EOF."""
+    try:
+        for line in stream:
+            lines.put(line)
+    except (OSError, ValueError):
+        pass
+    lines.put(None)
+
+
+_NUXT_MARKER = "window.__NUXT__"
+_SCRIPT_END = "</script>"
+
+
+def read_nuxt_script(chunks: Iterable[str]) -> str | None:
+    """Return the expression assigned in `window.__NUXT__ = ...;</script>`
+    from a page arriving in chunks. Mentions of window.__NUXT__ that are
+    not an assignment are skipped. Stops consuming chunks at the closing
+    </script>, and only buffers the text from the assignment on. None if
+    the page has no such script."""
+    buffer = ""
+    found = False
+    searched = 0
+    for chunk in chunks:
+        buffer += chunk
+        while not found:
+            start = buffer.find(_NUXT_MARKER)
+            if start < 0:
+                # Keep just enough for a marker split across chunks
+                buffer = buffer[-len(_NUXT_MARKER) + 1:]
+                break
+            rest = buffer[start + len(_NUXT_MARKER):]
+            operator = rest.lstrip()[:2]
+            if len(operator) < 2:
+                # Too little text yet to tell an assignment from a mention
+                buffer = buffer[start:]
+                break
+            if operator[0] == "=" and operator != "==":
+                buffer = rest.lstrip()[1:]
+                found = True
+            else:
+                buffer = rest  # e.g. `window.__NUXT__ || {}`; look further on
+        if not found:
+            continue
+        end = buffer.find(_SCRIPT_END, searched)
+        if end >= 0:
+            return _expression(buffer[:end])
+        searched = max(len(buffer) - len(_SCRIPT_END) + 1, 0)
+    return None
+
+
+def _expression(text: str) -> str | None:
+    """The assigned expression without surrounding space and trailing ";"."""
+    text = text.strip()
+    if text.endswith(";"):
+        text = text[:-1].rstrip()
+    return text or None
+
+
+_evaluator: NodeEvaluator | None = None
+_evaluator_lock = threading.Lock()
+
+
+def get_evaluator() -> NodeEvaluator:
+    """Return the process-wide evaluator, creating it on first use."""
+    global _evaluator
+    if _evaluator is None:
+        with _evaluator_lock:
+            if _evaluator is None:
+                _evaluator = NodeEvaluator()
+    return _evaluator
+
+
+def _close_evaluator() -> None:
+    if _evaluator is not None:
+        _evaluator.close()
+
+
+atexit.register(_close_evaluator)
@@ -0,0 +1,92 @@
+"""Time-bounded snapshot store of scraped articles, shared across runs.
+
+Snapshots live in memory for the server process and on disk under
+SNAPSHOT_DIR so separate CLI runs can reuse them too.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, replace
+
+from config import SNAPSHOT_DIR, SNAPSHOT_TTL, SNAPSHOT_TTLS
+from scrapers.base import Article
+
+
+def snapshot_ttl(source_name: str) -> float:
+    return SNAPSHOT_TTLS.get(source_name, SNAPSHOT_TTL)
+
+
+class SnapshotStore:
+    """Keeps the last successful article list per source with its fetch time."""
+
+    def __init__(self, directory: str = SNAPSHOT_DIR):
+        self.directory = directory
+        self._memory: dict[str, tuple[float, list[Article]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, source_name: str, ttl: float | None = None) -> tuple[list[Article], float] | None:
+        """Return (articles, age_seconds) if a snapshot younger than ttl exists.
+        Articles are copies, so callers may tag them freely."""
+        if ttl is None:
+            ttl = snapshot_ttl(source_name)
+        if ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._memory.get(source_name)
+        if entry is None:
+            entry = self._load(source_name)
+            if entry is None:
+                return None
+            with self._lock:
+                self._memory[source_name] = entry
+        fetched_at, articles = entry
+        age = time.time() - fetched_at
+        if age > ttl:
+            return None
+        return [_copy(a) for a in articles], age
+
+    def put(self, source_name: str, articles: list[Article]) -> None:
+        entry = (time.time(), [_copy(a) for a in articles])
+        with self._lock:
+            self._memory[source_name] = entry
+        self._save(source_name, entry)
+
+    def _path(self, source_name: str) -> str:
+        return os.path.join(self.directory, f"{source_name}.json")
+
+    def _load(self, source_name: str) -> tuple[float, list[Article]] | None:
+        try:
+            with open(self._path(source_name), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data["fetched_at"], [Article(**a) for a in data["articles"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _save(self, source_name: str, entry: tuple[float, list[Article]]) -> None:
+        fetched_at, articles = entry
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(source_name)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"fetched_at": fetched_at, "articles": [asdict(a) for a in articles]},
+                f, ensure_ascii=False,
+            )
+        os.replace(tmp_path, path)
+
+
+def _copy(article: Article) -> Article:
+    return replace(
+        article,
+        tags=list(article.tags),
+        related=list(article.related),
+        scores=dict(article.scores),
+    )
+
+
+# Process-wide store used by the pipeline
+snapshots = SnapshotStore()
@@ -0,0 +1,57 @@
+"""Per-URL HTTP validators (ETag / Last-Modified) for conditional requests.
+
+Each entry also keeps the article list parsed from the response it belongs
+to, so a 304 Not Modified can be answered without re-downloading or
+re-parsing. Entries are persisted as JSON so CLI runs share them.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+
+from config import HTTP_VALIDATORS_FILE
+
+
+class ValidatorStore:
+    def __init__(self, path: str = HTTP_VALIDATORS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] | None = None
+
+    def _load(self) -> dict[str, dict]:
+        if self._entries is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, key: str) -> dict | None:
+        """Return {"etag", "last_modified", "size", "articles"} or None."""
+        with self._lock:
+            return self._load().get(key)
+
+    def put(self, key: str, etag: str, last_modified: str, size: int, articles: list[dict]) -> None:
+        with self._lock:
+            entries = self._load()
+            if not etag and not last_modified:
+                entries.pop(key, None)
+            else:
+                entries[key] = {
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "size": size,
+                    "articles": articles,
+                }
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+
+# Process-wide store used by all scrapers
+validators = ValidatorStore()
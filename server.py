@@ -1,22 +1,52 @@
-"""Simple HTTP server to serve the display page and run main.py."""
+"""Simple HTTP server to serve the display page and run the scraping pipeline."""
 
 from __future__ import annotations
 
 import csv
+import gzip
+import hashlib
 import json
 import os
-import subprocess
-import sys
+import signal
+import threading
+import time
+import traceback
+import sqlite3
 import uuid
-from http.server import HTTPServer, SimpleHTTPRequestHandler
-from urllib.parse import urlparse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
 
 import markdown
 
+try:
+    import brotli
+except ImportError:  # optional: gzip is always available
+    brotli = None
+
+import main as pipeline
+from config import (
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_WORKERS,
+    JOB_HISTORY,
+    JOB_WORKERS,
+    SSE_HEARTBEAT,
+    SSE_MAX_DURATION,
+    SSE_MAX_STREAMS,
+    LLM_BATCH_CONCURRENCY,
+    LLM_MAX_IN_FLIGHT,
+    MARKDOWN_CACHE_ENTRIES,
+    PROFILES_CSV,
+)
+from metrics import aggregate as aggregate_metrics
+from storage import article_store
+
 PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
 OUTPUT_DIR = os.path.join(PROJECT_DIR, "output")
 
-# Load .env so subprocess (main.py) inherits LLM_API_KEY etc.
+# Load .env so the pipeline sees LLM_API_KEY etc.
 _env_path = os.path.join(PROJECT_DIR, ".env")
 if os.path.exists(_env_path):
     with open(_env_path, "r", encoding="utf-8") as _f:
@@ -26,7 +56,6 @@ if os.path.exists(_env_path):
                 _k, _v = _line.split("=", 1)
                 os.environ.setdefault(_k.strip(), _v.strip())
 HOTNEWS_ARTICLES = os.path.join(OUTPUT_DIR, "hotnews_articles.md")
-PROFILES_CSV = os.path.join(PROJECT_DIR, "profiles.csv")
 PROGRESS_FILE = os.path.join(OUTPUT_DIR, "progress.json")
 
 CSV_FIELDS = ["id", "name", "platform", "profile"]
@@ -34,11 +63,7 @@ CSV_FIELDS = ["id", "name", "platform", "profile"]
 
 def _read_profiles():
     """Read all profiles from CSV file."""
-    if not os.path.exists(PROFILES_CSV):
-        return []
-    with open(PROFILES_CSV, "r", encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f)
-        return list(reader)
+    return pipeline.read_profiles(PROFILES_CSV)
 
 
 def _write_profiles(profiles):
@@ -49,7 +74,248 @@ def _write_profiles(profiles):
         writer.writerows(profiles)
 
 
+# --- Markdown render cache ---
+class _RenderCache:
+    """Rendered /api/markdown HTML per persona, with gzip and brotli
+    variants compressed once.
+
+    An entry is valid while the (mtime, size) of every source file is
+    unchanged, so a repeated view costs a stat call per file instead of a
+    markdown conversion. Least recently used entries are evicted.
+    """
+
+    def __init__(self, max_entries: int = MARKDOWN_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, paths: list[str], render):
+        """Return the entry for paths, rendering render(paths) -> html on a
+        miss. An entry is {"etag", "html", "gzip", "br"}; html is bytes."""
+        signature = tuple(_file_signature(p) for p in paths)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == signature:
+                self._entries.move_to_end(key)
+                return cached[1]
+
+        html = render(paths).encode("utf-8")
+        entry = {
+            "etag": hashlib.sha1(html).hexdigest()[:20],
+            "html": html,
+            "gzip": gzip.compress(html, compresslevel=6),
+            "br": brotli.compress(html) if brotli is not None else None,
+        }
+        with self._lock:
+            self._entries[key] = (signature, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _render_markdown_files(paths):
+    """Concatenate the existing files (recommendations first, then the
+    articles report) and render them to HTML."""
+    parts = []
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                parts.append(f.read())
+    combined_md = "\n\n".join(parts)
+    if not combined_md.strip():
+        return ""
+    return markdown.markdown(combined_md, extensions=["tables", "fenced_code"])
+
+
+def _etag_matches(if_none_match, etag):
+    """If-None-Match check: weak comparison of each listed tag against etag."""
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+_render_cache = _RenderCache()
+
+
+# --- In-process job engine ---
+# The pipeline is imported once and runs on a worker pool, so each run
+# reuses the warm interpreter and pooled HTTP connections.
+_jobs: dict[str, dict] = {}
+# Streamed events per job (status changes, progress steps and each 选题 as
+# it is generated), replayed to every /api/jobs/<id>/stream client. This
+# in-memory bus replaces progress.json for server-run jobs.
+_job_events: dict[str, list[dict]] = {}
+_jobs_lock = threading.Lock()
+# Notified whenever a job changes state or publishes an event
+_jobs_changed = threading.Condition(_jobs_lock)
+# Open event streams, bounded so they can't take every HTTP worker
+_stream_slots = threading.BoundedSemaphore(SSE_MAX_STREAMS)
+# Set by server_close(); open streams end instead of waiting for their job
+_closing = threading.Event()
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+
+
+def _submit_job(kind, run, persona_name=""):
+    """Queue run(job, progress) on the worker pool and return the job record.
+    Whatever run returns becomes the job's result."""
+    job = {
+        "id": uuid.uuid4().hex[:12],
+        "kind": kind,
+        "status": "queued",
+        "persona_name": persona_name,
+        "created_at": time.time(),
+        "started_at": None,
+        "finished_at": None,
+        "progress": {"current": 0, "total": 0, "percentage": 0, "message": "排队中..."},
+        "result": None,
+        "error": None,
+    }
+    with _jobs_lock:
+        _jobs[job["id"]] = job
+        _job_events[job["id"]] = []
+        _prune_jobs()
+    _executor.submit(_run_job, job, run)
+    return job
+
+
+def _prune_jobs():
+    """Drop the oldest finished jobs beyond JOB_HISTORY. Caller holds _jobs_lock."""
+    finished = [j for j in _jobs.values() if j["status"] in ("done", "failed")]
+    finished.sort(key=lambda j: j["created_at"])
+    for j in finished[:max(len(finished) - JOB_HISTORY, 0)]:
+        del _jobs[j["id"]]
+        _job_events.pop(j["id"], None)
+
+
+def _publish(job, event, data):
+    """Append an event to the job's stream and wake its listeners."""
+    with _jobs_changed:
+        _job_events[job["id"]].append({"event": event, "data": data})
+        _jobs_changed.notify_all()
+
+
+def _run_job(job, run):
+    def progress(current, total, message=""):
+        data = {
+            "current": current,
+            "total": total,
+            "percentage": int((current / total) * 100) if total > 0 else 0,
+            "message": message,
+        }
+        with _jobs_changed:
+            job["progress"] = data
+            _job_events[job["id"]].append({"event": "progress", "data": data})
+            _jobs_changed.notify_all()
+
+    with _jobs_changed:
+        job["status"] = "running"
+        job["started_at"] = time.time()
+        _job_events[job["id"]].append({"event": "status", "data": {"status": "running"}})
+        _jobs_changed.notify_all()
+    try:
+        result = run(job, progress)
+        with _jobs_lock:
+            job["result"] = result
+            job["status"] = "done"
+    except Exception as e:
+        traceback.print_exc()
+        with _jobs_lock:
+            job["error"] = f"{type(e).__name__}: {e}"
+            job["status"] = "failed"
+    finally:
+        with _jobs_changed:
+            job["finished_at"] = time.time()
+            _jobs_changed.notify_all()
+
+
+def _pipeline_job(profile, persona_name, force_refresh, use_llm_cache=True):
+    def run(job, progress):
+        def on_topic(section):
+            html = markdown.markdown(section, extensions=["tables", "fenced_code"])
+            _publish(job, "topic", {"markdown": section, "html": html})
+
+        filepath = pipeline.run_pipeline(
+            profile, persona_name, progress=progress, force_refresh=force_refresh,
+            on_topic=on_topic, use_llm_cache=use_llm_cache,
+        )
+        return {"filepath": os.path.relpath(filepath, PROJECT_DIR)}
+    return run
+
+
+def _batch_job(profiles, force_refresh, concurrency, use_llm_cache=True):
+    def run(job, progress):
+        def on_persona(name, result):
+            result = dict(result)
+            if "filepath" in result:
+                result["filepath"] = os.path.relpath(result["filepath"], PROJECT_DIR)
+            with _jobs_lock:
+                job["personas"].append(result)
+
+        with _jobs_lock:
+            job["personas"] = []
+        pipeline.run_batch(
+            profiles, progress=progress, force_refresh=force_refresh,
+            concurrency=concurrency, on_persona=on_persona, use_llm_cache=use_llm_cache,
+        )
+        with _jobs_lock:
+            personas = list(job["personas"])
+        return {
+            "personas": personas,
+            "succeeded": sum(1 for p in personas if p["success"]),
+            "failed": sum(1 for p in personas if not p["success"]),
+        }
+    return run
+
+
+def _job_snapshot(job):
+    with _jobs_lock:
+        return json.loads(json.dumps(job))
+
+
+class PooledHTTPServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer that serves connections on a bounded worker pool
+    instead of one unbounded thread per connection."""
+
+    def __init__(self, server_address, handler_class, max_workers=HTTP_WORKERS):
+        super().__init__(server_address, handler_class)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="http")
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self.process_request_thread, request, client_address)
+
+    def server_close(self):
+        super().server_close()
+        # End open event streams, then let in-flight requests finish
+        with _jobs_changed:
+            _closing.set()
+            _jobs_changed.notify_all()
+        self._pool.shutdown(wait=True)
+
+
 class Handler(SimpleHTTPRequestHandler):
+    # HTTP/1.1 keeps connections alive between polls; every response must
+    # therefore carry Content-Length. Idle connections time out so they don't
+    # pin a worker forever. Headers and body go out in separate writes, so
+    # Nagle would add a delayed-ACK stall to every keep-alive response.
+    protocol_version = "HTTP/1.1"
+    timeout = HTTP_KEEPALIVE_TIMEOUT
+    disable_nagle_algorithm = True
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, directory=OUTPUT_DIR, **kwargs)
 
@@ -69,11 +335,25 @@ class Handler(SimpleHTTPRequestHandler):
             return self._export_recommendations()
         if path == "/api/progress":
             return self._get_progress()
+        if path == "/api/articles":
+            return self._query_articles()
+        if path == "/api/runs":
+            return self._list_runs()
+        if path == "/api/metrics":
+            return self._get_metrics()
+        if path == "/api/jobs":
+            return self._list_jobs()
+        if path.startswith("/api/jobs/") and path.endswith("/stream"):
+            return self._stream_job(path[len("/api/jobs/"):-len("/stream")])
+        if path.startswith("/api/jobs/"):
+            return self._get_job(path[len("/api/jobs/"):])
         return super().do_GET()
 
     def do_POST(self):
         if self.path == "/api/run":
             return self._run_main()
+        if self.path == "/api/run-batch":
+            return self._run_batch()
         if self.path == "/api/profiles":
             return self._add_profile()
         self.send_error(404)
@@ -101,41 +381,46 @@ class Handler(SimpleHTTPRequestHandler):
 
     def _serve_markdown(self):
         # Get persona_name from query parameter
-        from urllib.parse import parse_qs
         query = urlparse(self.path).query
         params = parse_qs(query)
         persona_name = params.get('persona', [''])[0]
 
-        # Build combined markdown content
-        combined_md = ""
-
-        # If persona is specified, load their recommendations first
+        # Recommendations first (if a persona is given), then the articles data
+        paths = []
         if persona_name:
-            recommendations_file = os.path.join(OUTPUT_DIR, f"hotnews_推荐_{persona_name}.md")
-            if os.path.exists(recommendations_file):
-                with open(recommendations_file, "r", encoding="utf-8") as f:
-                    combined_md = f.read()
-                combined_md += "\n\n"
-
-        # Always append the articles data
-        if os.path.exists(HOTNEWS_ARTICLES):
-            with open(HOTNEWS_ARTICLES, "r", encoding="utf-8") as f:
-                combined_md += f.read()
-
-        if not combined_md.strip():
-            self.send_response(200)
-            self.send_header("Content-Type", "text/html; charset=utf-8")
-            self.send_header("Cache-Control", "no-cache, no-store, must-revalidate")
+            paths.append(os.path.join(OUTPUT_DIR, f"hotnews_推荐_{persona_name}.md"))
+        paths.append(HOTNEWS_ARTICLES)
+        entry = _render_cache.get(persona_name, paths, _render_markdown_files)
+
+        # One strong validator per representation
+        accept = self.headers.get("Accept-Encoding", "")
+        if entry["br"] is not None and "br" in accept:
+            encoding, payload, etag = "br", entry["br"], f'"{entry["etag"]}-br"'
+        elif "gzip" in accept:
+            encoding, payload, etag = "gzip", entry["gzip"], f'"{entry["etag"]}-gz"'
+        else:
+            encoding, payload, etag = None, entry["html"], f'"{entry["etag"]}"'
+
+        if _etag_matches(self.headers.get("If-None-Match", ""), etag):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Vary", "Accept-Encoding")
+            self.send_header("Content-Length", "0")
             self.end_headers()
-            self.wfile.write(b"")
             return
 
-        html = markdown.markdown(combined_md, extensions=["tables", "fenced_code"])
-        payload = html.encode("utf-8")
+        if not entry["html"]:
+            encoding, payload = None, b""
         self.send_response(200)
         self.send_header("Content-Type", "text/html; charset=utf-8")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
         self.send_header("Content-Length", str(len(payload)))
-        self.send_header("Cache-Control", "no-cache, no-store, must-revalidate")
+        self.send_header("ETag", etag)
+        # Revalidate on every view; unchanged reports answer 304
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
         self.end_headers()
         self.wfile.write(payload)
 
@@ -158,7 +443,6 @@ class Handler(SimpleHTTPRequestHandler):
     def _export_recommendations(self):
         """Export only the recommendations section (LLM-generated topics)."""
         # Get persona_name from query parameter
-        from urllib.parse import parse_qs
         query = urlparse(self.path).query
         params = parse_qs(query)
         persona_name = params.get('persona', [''])[0]
@@ -184,45 +468,182 @@ class Handler(SimpleHTTPRequestHandler):
         self.wfile.write(payload)
 
     def _run_main(self):
-        content_length = int(self.headers.get("Content-Length", 0))
-        body = self.rfile.read(content_length) if content_length else b"{}"
-        data = json.loads(body)
+        data = self._read_body()
         profile = data.get("profile", "")
-        persona_name = data.get("persona_name", "")
-
-        cmd = [sys.executable, os.path.join(PROJECT_DIR, "main.py")]
-        if profile:
-            cmd.append(profile)
-            cmd.append(persona_name or "达人")
+        persona_name = (data.get("persona_name", "") or "达人") if profile else ""
+        run = _pipeline_job(
+            profile, persona_name, bool(data.get("force_refresh")),
+            data.get("use_llm_cache", True) is not False,
+        )
+        job = _submit_job("run", run, persona_name)
+        self._json_response({"success": True, "job_id": job["id"]}, status=202)
+
+    def _run_batch(self):
+        """Generate for every profile in profiles.csv (or the given "ids")."""
+        try:
+            data = self._read_body()
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            self._json_response({"success": False, "error": "参数格式错误"}, status=400)
+            return
+        all_profiles = _read_profiles()
+        profiles = [p for p in all_profiles if (p.get("profile") or "").strip()]
+        ids = data.get("ids")
+        if ids is not None:
+            if not isinstance(ids, list) or not all(isinstance(i, (str, int)) for i in ids):
+                self._json_response({"success": False, "error": "ids 必须是达人 id 列表"}, status=400)
+                return
+            ids = {str(i) for i in ids}
+            unknown = sorted(ids - {p["id"] for p in all_profiles})
+            if unknown:
+                self._json_response(
+                    {"success": False, "error": f"未找到达人: {', '.join(unknown)}"}, status=400,
+                )
+                return
+            if ids:
+                profiles = [p for p in profiles if p["id"] in ids]
+        if not profiles:
+            self._json_response({"success": False, "error": "没有可用的达人画像"})
+            return
+        concurrency = data.get("concurrency") or LLM_BATCH_CONCURRENCY
+        if isinstance(concurrency, bool) or not isinstance(concurrency, int) or concurrency < 1:
+            self._json_response({"success": False, "error": "concurrency 必须是正整数"}, status=400)
+            return
+        # run_batch never runs more personas at once than LLM attempt slots
+        concurrency = min(concurrency, LLM_MAX_IN_FLIGHT)
+        run = _batch_job(
+            profiles, bool(data.get("force_refresh")), concurrency,
+            data.get("use_llm_cache", True) is not False,
+        )
+        job = _submit_job("batch", run)
+        self._json_response(
+            {"success": True, "job_id": job["id"], "personas": len(profiles)}, status=202,
+        )
+
+    def _query_articles(self):
+        """Historical lookup: /api/articles?run=&source=&since=&until=&precious=1&q=&limit=
+        Without run or a time range, returns the latest run."""
+        params = parse_qs(urlparse(self.path).query)
+
+        def param(name):
+            return params.get(name, [""])[0].strip()
 
         try:
-            result = subprocess.run(
-                cmd,
-                cwd=PROJECT_DIR,
-                capture_output=True,
-                text=True,
-                timeout=300,
-                env=os.environ.copy(),  # Explicitly pass environment variables
+            run_id = int(param("run")) if param("run") else None
+            limit = min(int(param("limit") or 500), 5000)
+        except ValueError:
+            self._json_response({"success": False, "error": "参数格式错误"}, status=400)
+            return
+        since, until = param("since"), param("until")
+        try:
+            if run_id is None and not (since or until):
+                latest = article_store.run()
+                run_id = latest["id"] if latest else None
+                if run_id is None:
+                    self._json_response({"run": None, "articles": []})
+                    return
+            articles = article_store.articles(
+                run_id=run_id,
+                source=param("source") or None,
+                since=since or None,
+                until=until or None,
+                precious_only=param("precious") in ("1", "true"),
+                keyword=param("q") or None,
+                limit=limit,
             )
-            print(result.stdout)
-            if result.stderr:
-                print(result.stderr, file=sys.stderr)
-
-            success = result.returncode == 0
-            resp = {"success": success}
-            if not success:
-                resp["error"] = result.stderr[-500:] if result.stderr else "exit code " + str(result.returncode)
-        except subprocess.TimeoutExpired:
-            resp = {"success": False, "error": "执行超时"}
-        except Exception as e:
-            resp = {"success": False, "error": str(e)}
-
-        payload = json.dumps(resp, ensure_ascii=False).encode("utf-8")
+        except sqlite3.Error as e:
+            self._json_response({"success": False, "error": f"文章库不可用: {e}"}, status=503)
+            return
+        self._json_response({"run": run_id, "articles": [asdict(a) for a in articles]})
+
+    def _list_runs(self):
+        try:
+            self._json_response(article_store.runs())
+        except sqlite3.Error as e:
+            self._json_response({"success": False, "error": f"文章库不可用: {e}"}, status=503)
+
+    def _get_metrics(self):
+        """p50/p95 per stage over the newest runs: /api/metrics?limit=50"""
+        params = parse_qs(urlparse(self.path).query)
+        try:
+            limit = int(params.get("limit", ["0"])[0] or 0)
+        except ValueError:
+            self._json_response({"success": False, "error": "参数格式错误"}, status=400)
+            return
+        self._json_response(aggregate_metrics(limit=limit) if limit > 0 else aggregate_metrics())
+
+    def _list_jobs(self):
+        with _jobs_lock:
+            jobs = sorted(_jobs.values(), key=lambda j: j["created_at"], reverse=True)
+            jobs = json.loads(json.dumps(jobs))
+        self._json_response(jobs)
+
+    def _get_job(self, job_id):
+        job = _jobs.get(job_id)
+        if job is None:
+            self._json_response({"success": False, "error": "未找到该任务"}, status=404)
+            return
+        self._json_response(_job_snapshot(job))
+
+    def _stream_job(self, job_id):
+        """Server-Sent Events stream of a job's events, replayed from the
+        start (or after Last-Event-ID), ending with an "end" event.
+
+        At most SSE_MAX_STREAMS are open at once; others get 503 and the
+        page polls instead. A stream sends a heartbeat every SSE_HEARTBEAT
+        seconds, so a dead client fails the write and frees the worker, and
+        closes after SSE_MAX_DURATION (EventSource reconnects and resumes)."""
+        job = _jobs.get(job_id)
+        if job is None:
+            self._json_response({"success": False, "error": "未找到该任务"}, status=404)
+            return
+        if not _stream_slots.acquire(blocking=False):
+            self._json_response({"success": False, "error": "实时连接已满，请轮询任务状态"}, status=503)
+            return
+        try:
+            self._send_job_events(job_id, job)
+        finally:
+            _stream_slots.release()
+
+    def _send_job_events(self, job_id, job):
+        # The stream has no Content-Length, so it ends by closing the connection
+        self.close_connection = True
         self.send_response(200)
-        self.send_header("Content-Type", "application/json; charset=utf-8")
-        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
         self.end_headers()
-        self.wfile.write(payload)
+
+        try:
+            next_index = int(self.headers.get("Last-Event-ID") or -1) + 1
+        except ValueError:
+            next_index = 0
+        deadline = time.monotonic() + SSE_MAX_DURATION
+        try:
+            while not _closing.is_set() and time.monotonic() < deadline:
+                with _jobs_changed:
+                    events = _job_events.get(job_id, [])
+                    if len(events) <= next_index and job["finished_at"] is None and not _closing.is_set():
+                        _jobs_changed.wait(timeout=SSE_HEARTBEAT)
+                    new_events = events[next_index:]
+                    finished = job["finished_at"] is not None
+                for event in new_events:
+                    data = json.dumps(event["data"], ensure_ascii=False)
+                    self.wfile.write(
+                        f"id: {next_index}\nevent: {event['event']}\ndata: {data}\n\n".encode("utf-8")
+                    )
+                    next_index += 1
+                if finished and not new_events:
+                    data = json.dumps({"status": job["status"], "error": job["error"]}, ensure_ascii=False)
+                    self.wfile.write(f"event: end\ndata: {data}\n\n".encode("utf-8"))
+                    break
+                if not new_events:
+                    self.wfile.write(b": ping\n\n")
+                self.wfile.flush()
+        except OSError:
+            # Client went away, or a write timed out on a stalled one
+            pass
 
     def _json_response(self, data, status=200):
         payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
@@ -289,7 +710,19 @@ class Handler(SimpleHTTPRequestHandler):
         self._json_response({"success": True})
 
     def _get_progress(self):
-        """Return current progress of the running task."""
+        """Return current progress of the running task.
+
+        Polling fallback for clients without EventSource: answered from the
+        newest job in memory. Only when this server has run no job yet is
+        progress.json consulted, which a CLI run may be writing."""
+        with _jobs_lock:
+            active = [j for j in _jobs.values() if j["status"] in ("queued", "running")]
+            latest = max(active or _jobs.values(), key=lambda j: j["created_at"], default=None)
+            progress = dict(latest["progress"]) if latest else None
+        if progress is not None:
+            self._json_response(progress)
+            return
+
         if not os.path.exists(PROGRESS_FILE):
             self._json_response({"current": 0, "total": 0, "percentage": 0, "message": ""})
             return
@@ -317,13 +750,22 @@ class Handler(SimpleHTTPRequestHandler):
 
 def main():
     port = 8000
-    server = HTTPServer(("0.0.0.0", port), Handler)
+    server = PooledHTTPServer(("0.0.0.0", port), Handler)
+
+    def request_shutdown(signum, frame):
+        # shutdown() blocks until serve_forever() returns, so it can't run on
+        # the thread that is inside serve_forever()
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, request_shutdown)
+    signal.signal(signal.SIGINT, request_shutdown)
+
     print(f"服务已启动: http://localhost:{port}")
-    try:
-        server.serve_forever()
-    except KeyboardInterrupt:
-        print("\n服务已停止")
-        server.server_close()
+    server.serve_forever()
+    print("\n正在停止服务，等待进行中的请求和任务完成...")
+    server.server_close()
+    _executor.shutdown(wait=True, cancel_futures=True)
+    print("服务已停止")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,363 @@
+"""SQLite-backed persistence for scraped articles.
+
+One database (output/hotnews.db) holds the seen-article index used for
+incremental tagging and the article store that keeps every run's articles
+for the report and historical queries.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from config import (
+    ARTICLE_INDEX_RETENTION,
+    ARTICLE_NEW_WINDOW,
+    ARTICLE_STORE_RETENTION,
+    DB_PATH,
+)
+from filters import keyword_signature
+from scrapers.base import Article
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_articles (
+    key TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    tags TEXT NOT NULL DEFAULT '[]',
+    is_precious_metals INTEGER NOT NULL DEFAULT 0,
+    scores TEXT NOT NULL DEFAULT '{}',
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    article_count INTEGER NOT NULL,
+    errors TEXT NOT NULL DEFAULT '[]'
+);
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL DEFAULT '',
+    summary TEXT NOT NULL DEFAULT '',
+    published_at TEXT NOT NULL DEFAULT '',
+    author TEXT NOT NULL DEFAULT '',
+    hits INTEGER NOT NULL DEFAULT 0,
+    tags TEXT NOT NULL DEFAULT '[]',
+    is_precious_metals INTEGER NOT NULL DEFAULT 0,
+    is_new INTEGER NOT NULL DEFAULT 0,
+    related TEXT NOT NULL DEFAULT '[]',
+    scores TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_articles_run ON articles(run_id, source, position);
+CREATE INDEX IF NOT EXISTS idx_articles_source ON articles(source);
+CREATE INDEX IF NOT EXISTS idx_articles_published_at ON articles(published_at);
+CREATE INDEX IF NOT EXISTS idx_articles_precious ON articles(is_precious_metals);
+"""
+
+_ARTICLE_COLUMNS = (
+    "source", "title", "url", "summary", "published_at", "author", "hits",
+    "tags", "is_precious_metals", "is_new", "related", "scores",
+)
+
+# Columns added after the first release of the schema: (table, column, definition)
+_ADDED_COLUMNS = [
+    ("articles", "related", "TEXT NOT NULL DEFAULT '[]'"),
+    ("articles", "scores", "TEXT NOT NULL DEFAULT '{}'"),
+    ("seen_articles", "scores", "TEXT NOT NULL DEFAULT '{}'"),
+]
+
+_initialized: set[str] = set()
+_init_lock = threading.Lock()
+
+
+def connect(path: str = DB_PATH) -> sqlite3.Connection:
+    """Open a connection, creating the schema on first use of the file.
+    Connections are cheap; callers open one per operation and close it."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    if path not in _initialized:
+        with _init_lock:
+            if path not in _initialized:
+                conn.executescript(_SCHEMA)
+                _migrate(conn)
+                _initialized.add(path)
+    return conn
+
+
+def article_key(article: Article) -> str:
+    """Stable identity of an article within its source: its URL (which
+    carries the source's id), or the title when there is no URL."""
+    return f"{article.source}|{article.url or article.title}"
+
+
+def _fingerprint(article: Article, signature: str) -> str:
+    """Identifies what an article's tags were computed from: its title and
+    summary, and the keyword configuration (keyword_signature())."""
+    material = json.dumps([article.title, article.summary, signature], ensure_ascii=False)
+    return hashlib.sha1(material.encode("utf-8")).hexdigest()
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """Add columns introduced after a database file was created."""
+    for table, column, definition in _ADDED_COLUMNS:
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    conn.commit()
+
+
+class ArticleIndex:
+    """Remembers every article seen across runs.
+
+    mark() flags articles first seen within ARTICLE_NEW_WINDOW as new and
+    restores the stored tags of those whose title and summary are unchanged
+    and were tagged under the current keyword configuration, so only new or
+    edited articles (or all of them after a keyword change) go through the
+    keyword filter. record() stores the result after filtering.
+    """
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        return connect(self.path)
+
+    def mark(self, articles: list[Article]) -> list[Article]:
+        """Set is_new on every article and return the ones that still need
+        tagging (unseen, or changed since they were last tagged)."""
+        now = time.time()
+        signature = keyword_signature()
+        keys = [article_key(a) for a in articles]
+        rows: dict[str, tuple] = {}
+        conn = self._connect()
+        try:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for row in conn.execute(
+                    "SELECT key, fingerprint, tags, is_precious_metals, scores, first_seen "
+                    f"FROM seen_articles WHERE key IN ({placeholders})",
+                    chunk,
+                ):
+                    rows[row[0]] = row[1:]
+        finally:
+            conn.close()
+
+        untagged: list[Article] = []
+        for article, key in zip(articles, keys):
+            row = rows.get(key)
+            if row is None:
+                article.is_new = True
+                untagged.append(article)
+                continue
+            fingerprint, tags, is_precious_metals, scores, first_seen = row
+            article.is_new = now - first_seen <= ARTICLE_NEW_WINDOW
+            if fingerprint == _fingerprint(article, signature):
+                article.tags = json.loads(tags)
+                article.is_precious_metals = bool(is_precious_metals)
+                article.scores = json.loads(scores)
+            else:
+                untagged.append(article)
+        return untagged
+
+    def record(self, articles: list[Article]) -> None:
+        """Upsert tagged articles in one transaction and forget articles not
+        seen for ARTICLE_INDEX_RETENTION seconds."""
+        now = time.time()
+        signature = keyword_signature()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    """INSERT INTO seen_articles
+                        (key, source, fingerprint, tags, is_precious_metals, scores,
+                         first_seen, last_seen)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(key) DO UPDATE SET
+                        fingerprint = excluded.fingerprint,
+                        tags = excluded.tags,
+                        is_precious_metals = excluded.is_precious_metals,
+                        scores = excluded.scores,
+                        last_seen = excluded.last_seen""",
+                    [
+                        (
+                            article_key(a),
+                            a.source,
+                            _fingerprint(a, signature),
+                            json.dumps(a.tags, ensure_ascii=False),
+                            int(a.is_precious_metals),
+                            json.dumps(a.scores),
+                            now,
+                            now,
+                        )
+                        for a in articles
+                    ],
+                )
+                conn.execute(
+                    "DELETE FROM seen_articles WHERE last_seen < ?",
+                    (now - ARTICLE_INDEX_RETENTION,),
+                )
+        finally:
+            conn.close()
+
+
+class ArticleStore:
+    """Every run's articles and errors, queryable by source, publish time
+    and precious-metals flag. The articles report is rendered from here."""
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        return connect(self.path)
+
+    def save_run(self, articles: list[Article], errors: list[str]) -> int:
+        """Store one scrape run in a single transaction and drop runs older
+        than ARTICLE_STORE_RETENTION. Returns the run id."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                cursor = conn.execute(
+                    "INSERT INTO runs (created_at, article_count, errors) VALUES (?, ?, ?)",
+                    (now, len(articles), json.dumps(errors, ensure_ascii=False)),
+                )
+                run_id = cursor.lastrowid
+                conn.executemany(
+                    f"INSERT INTO articles (run_id, position, {', '.join(_ARTICLE_COLUMNS)}) "
+                    f"VALUES (?, ?, {', '.join('?' * len(_ARTICLE_COLUMNS))})",
+                    [
+                        (
+                            run_id, position, a.source, a.title, a.url, a.summary,
+                            a.published_at, a.author, a.hits,
+                            json.dumps(a.tags, ensure_ascii=False),
+                            int(a.is_precious_metals), int(a.is_new),
+                            json.dumps(a.related, ensure_ascii=False),
+                            json.dumps(a.scores, ensure_ascii=False),
+                        )
+                        for position, a in enumerate(articles)
+                    ],
+                )
+                conn.execute(
+                    "DELETE FROM runs WHERE created_at < ?",
+                    (now - ARTICLE_STORE_RETENTION,),
+                )
+            return run_id
+        finally:
+            conn.close()
+
+    def runs(self, limit: int = 20) -> list[dict]:
+        """Most recent runs first: {"id", "created_at", "article_count", "errors"}."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT id, created_at, article_count, errors FROM runs ORDER BY id DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [
+            {"id": r[0], "created_at": r[1], "article_count": r[2], "errors": json.loads(r[3])}
+            for r in rows
+        ]
+
+    def run(self, run_id: int | None = None) -> dict | None:
+        """One run by id, or the latest run."""
+        conn = self._connect()
+        try:
+            if run_id is None:
+                row = conn.execute(
+                    "SELECT id, created_at, article_count, errors FROM runs ORDER BY id DESC LIMIT 1"
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT id, created_at, article_count, errors FROM runs WHERE id = ?",
+                    (run_id,),
+                ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        return {"id": row[0], "created_at": row[1], "article_count": row[2], "errors": json.loads(row[3])}
+
+    def articles(
+        self,
+        run_id: int | None = None,
+        source: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        precious_only: bool = False,
+        keyword: str | None = None,
+        limit: int | None = None,
+    ) -> list[Article]:
+        """Query stored articles. Within a run they come back grouped by
+        source in scrape order; across runs, each article appears once (its
+        latest copy), newest published first.
+        since/until compare against published_at as stored by the scrapers
+        ("YYYY-MM-DD HH:MM[:SS]")."""
+        clauses: list[str] = []
+        params: list = []
+        if run_id is not None:
+            clauses.append("run_id = ?")
+            params.append(run_id)
+        else:
+            clauses.append("id IN (SELECT MAX(id) FROM articles GROUP BY source, url, title)")
+        if source:
+            clauses.append("source = ?")
+            params.append(source)
+        if since:
+            clauses.append("published_at >= ?")
+            params.append(since)
+        if until:
+            clauses.append("published_at <= ?")
+            params.append(until)
+        if precious_only:
+            clauses.append("is_precious_metals = 1")
+        if keyword:
+            # Match % and _ in the keyword literally
+            pattern = keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            clauses.append("(title LIKE ? ESCAPE '\\' OR summary LIKE ? ESCAPE '\\')")
+            params.extend([f"%{pattern}%"] * 2)
+        sql = f"SELECT {', '.join(_ARTICLE_COLUMNS)} FROM articles"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if run_id is not None:
+            sql += " ORDER BY source, position"
+        else:
+            sql += " ORDER BY published_at DESC, id DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+        return [_row_to_article(r) for r in rows]
+
+
+def _row_to_article(row: tuple) -> Article:
+    values = dict(zip(_ARTICLE_COLUMNS, row))
+    values["tags"] = json.loads(values["tags"])
+    values["related"] = json.loads(values["related"])
+    values["scores"] = json.loads(values["scores"])
+    values["is_precious_metals"] = bool(values["is_precious_metals"])
+    values["is_new"] = bool(values["is_new"])
+    return Article(**values)
+
+
+article_index = ArticleIndex()
+article_store = ArticleStore()